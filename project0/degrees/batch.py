@@ -0,0 +1,114 @@
+"""
+Answers degrees-of-separation queries for a file of source/target pairs.
+
+Each line of the pairs file holds two comma-separated people, given as
+either a person ID or a name. Names shared by several people are
+resolved by the --ambiguous policy, or reported as errors by default.
+The dataset is loaded once and queries are fanned out to forked worker
+processes, which share the loaded graph copy-on-write. Results are
+written as JSON lines in input order, with an error record for each
+line that does not hold two people.
+
+Usage: python batch.py pairs.csv [directory] [--workers N] [--output FILE]
+                       [--ambiguous POLICY]
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+
+import degrees
+from nameindex import POLICIES, AmbiguousName
+
+
+# How names matching several people are resolved, set from --ambiguous
+policy = "error"
+
+
+def query(row):
+    """
+    Answers the query on a row of the pairs file, returning a JSON-ready
+    dict. Rows without exactly two people get an error record.
+    """
+    if len(row) != 2:
+        return {"row": row,
+                "error": f"expected two people per line, got {len(row)}"}
+    source, target = row
+    record = {"source": source, "target": target}
+    try:
+        path = degrees.shortest_path(
+            degrees.resolve_person(source, policy),
+            degrees.resolve_person(target, policy)
+        )
+    except (AmbiguousName, LookupError, ValueError) as e:
+        record["error"] = str(e)
+        return record
+    if path is None:
+        record["degrees"] = None
+        record["path"] = None
+    else:
+        record["degrees"] = len(path)
+        record["path"] = [list(step) for step in path]
+    return record
+
+
+def read_pairs(filename):
+    """
+    Yields the rows of a CSV file with each field stripped, skipping
+    blank lines. Rows are yielded even if they do not hold a pair, so
+    that query can report them in place.
+    """
+    with open(filename, encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            yield [field.strip() for field in row]
+
+
+def run_batch(pairs, out, workers, chunksize=64):
+    """
+    Writes a JSON line to out for each row of pairs, in input order.
+    """
+    if workers == 1:
+        for record in map(query, pairs):
+            out.write(json.dumps(record) + "\n")
+        return
+
+    # Fork after loading so workers inherit the graph without copying it
+    context = multiprocessing.get_context("fork")
+    with context.Pool(workers) as pool:
+        for record in pool.imap(query, pairs, chunksize):
+            out.write(json.dumps(record) + "\n")
+
+
+def main():
+    global policy
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pairs")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", help="file to write (default: stdout)")
+    parser.add_argument("--ambiguous", choices=POLICIES, default="error",
+                        help="how to resolve names shared by several people")
+    args = parser.parse_args()
+
+    policy = args.ambiguous
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory)
+    degrees.get_name_index()
+    print("Data loaded.", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            run_batch(read_pairs(args.pairs), out, args.workers)
+    else:
+        run_batch(read_pairs(args.pairs), sys.stdout, args.workers)
+
+
+if __name__ == "__main__":
+    main()
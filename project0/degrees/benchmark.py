@@ -0,0 +1,214 @@
+"""
+Benchmarks for the degrees search components.
+
+Usage: python benchmark.py frontier [--size N]
+       python benchmark.py search directory [--queries N] [--strategy S ...]
+"""
+
+import argparse
+import json
+import random
+import resource
+import time
+
+import degrees
+from landmarks import LandmarkIndex
+from snapshot import fingerprint, save_snapshot
+from util import Node, StackFrontier, QueueFrontier, PriorityFrontier
+
+
+class ListQueueFrontier():
+    """
+    Reference list-backed queue frontier with a linear state scan and
+    slicing removal, for comparison against QueueFrontier.
+    """
+
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        node = self.frontier[0]
+        self.frontier = self.frontier[1:]
+        return node
+
+
+def time_frontier(frontier, size):
+    """
+    Adds size nodes to frontier, checking membership before each add,
+    then removes them all. Returns the elapsed time in seconds.
+    """
+    start = time.perf_counter()
+    for state in range(size):
+        if not frontier.contains_state(state):
+            frontier.add(Node(state=state, parent=None, action=None))
+    while not frontier.empty():
+        frontier.remove()
+    return time.perf_counter() - start
+
+
+def benchmark_frontiers(size, reference_size):
+    """
+    Prints timings for each frontier class at the given size, and for
+    the list-backed reference at a smaller size.
+    """
+    print(f"{'frontier':<20}{'nodes':>12}{'seconds':>12}{'ns/node':>12}")
+    runs = [
+        (ListQueueFrontier, reference_size),
+        (StackFrontier, size),
+        (QueueFrontier, size),
+        (PriorityFrontier, size),
+    ]
+    for frontier_class, nodes in runs:
+        elapsed = time_frontier(frontier_class(), nodes)
+        print(f"{frontier_class.__name__:<20}{nodes:>12}{elapsed:>12.3f}"
+              f"{elapsed / nodes * 1e9:>12.0f}")
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of a sorted list of values.
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process, in megabytes.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def benchmark_search(directory, queries, strategies, landmark_count, seed):
+    """
+    Loads a dataset and times random queries under each search strategy.
+    Returns the results as a dictionary.
+    """
+    results = {"directory": directory, "queries": queries}
+
+    # Parse the CSV files, then time loading a snapshot written from them
+    files = fingerprint(directory)
+    start = time.perf_counter()
+    degrees.load_data(directory, use_snapshot=False)
+    results["csv_load_seconds"] = time.perf_counter() - start
+    save_snapshot(directory, degrees.graph, degrees.people, degrees.movies,
+                  degrees.names, files)
+    start = time.perf_counter()
+    degrees.load_data(directory)
+    results["snapshot_load_seconds"] = time.perf_counter() - start
+    results["people"] = len(degrees.graph.person_ids)
+    results["movies"] = len(degrees.graph.movie_ids)
+    results["stars"] = len(degrees.graph.person_movies)
+
+    # Bidirectional searches use the index to reject unconnected pairs
+    if landmark_count > 0:
+        start = time.perf_counter()
+        degrees.landmarks = LandmarkIndex.build(degrees.graph, landmark_count)
+        results["landmark_build_seconds"] = time.perf_counter() - start
+    results["peak_rss_mb"] = peak_rss()
+
+    # Query people who starred in at least one movie
+    rng = random.Random(seed)
+    graph = degrees.graph
+    candidates = [
+        person_id for p, person_id in enumerate(graph.person_ids)
+        if graph.degree(p) > 0
+    ]
+    pairs = [(rng.choice(candidates), rng.choice(candidates))
+             for _ in range(queries)]
+
+    results["strategies"] = {}
+    lengths = {}
+    for strategy in strategies:
+        latencies = []
+        expanded = []
+        lengths[strategy] = []
+        for source, target in pairs:
+            start = time.perf_counter()
+            path = degrees.shortest_path(source, target, strategy,
+                                         use_cache=False)
+            latencies.append(time.perf_counter() - start)
+            expanded.append(graph.expanded)
+            lengths[strategy].append(None if path is None else len(path))
+        latencies.sort()
+        results["strategies"][strategy] = {
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p90_ms": percentile(latencies, 0.90) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "max_ms": latencies[-1] * 1000,
+            "mean_expanded": sum(expanded) / len(expanded),
+            "max_expanded": max(expanded),
+            "disagreements": sum(
+                1 for a, b in zip(lengths[strategy], lengths[strategies[0]])
+                if a != b
+            )
+        }
+    results["peak_rss_mb"] = peak_rss()
+    return results
+
+
+def print_search_results(results):
+    """
+    Prints search benchmark results as a table.
+    """
+    print(f"{results['people']} people, {results['movies']} movies, "
+          f"{results['stars']} stars")
+    print(f"CSV load: {results['csv_load_seconds']:.2f}s, "
+          f"snapshot load: {results['snapshot_load_seconds']:.2f}s, "
+          f"peak RSS: {results['peak_rss_mb']:.0f} MB")
+    if "landmark_build_seconds" in results:
+        print(f"Landmark build: {results['landmark_build_seconds']:.2f}s")
+    print(f"{'strategy':<16}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}"
+          f"{'max ms':>10}{'expanded':>12}{'differ':>8}")
+    for strategy, row in results["strategies"].items():
+        print(f"{strategy:<16}{row['p50_ms']:>10.2f}{row['p90_ms']:>10.2f}"
+              f"{row['p99_ms']:>10.2f}{row['max_ms']:>10.2f}"
+              f"{row['mean_expanded']:>12.0f}{row['disagreements']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    frontier = commands.add_parser("frontier", help="time frontier operations")
+    frontier.add_argument("--size", type=int, default=2_000_000)
+    frontier.add_argument("--reference-size", type=int, default=5_000,
+                          help="nodes for the quadratic list-backed reference")
+
+    search = commands.add_parser("search", help="time shortest_path queries")
+    search.add_argument("directory")
+    search.add_argument("--queries", type=int, default=200)
+    search.add_argument("--strategy", action="append",
+                        choices=degrees.STRATEGIES,
+                        help="strategy to time (default: all)")
+    search.add_argument("--landmarks", type=int, default=16,
+                        help="landmarks for rejecting unconnected pairs "
+                             "(0 for none)")
+    search.add_argument("--seed", type=int, default=50)
+    search.add_argument("--json", help="also write results to this file")
+
+    args = parser.parse_args()
+    if args.command == "frontier":
+        benchmark_frontiers(args.size, args.reference_size)
+    elif args.command == "search":
+        results = benchmark_search(
+            args.directory, args.queries,
+            args.strategy or list(degrees.STRATEGIES), args.landmarks,
+            args.seed
+        )
+        print_search_results(results)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Command-line client for the degrees query server.
+
+Usage: python client.py [--socket PATH] path SOURCE TARGET [--policy P]
+       python client.py [--socket PATH] lookup NAME [--mode MODE]
+       python client.py [--socket PATH] stats
+"""
+
+import argparse
+import json
+import socket
+import sys
+
+from nameindex import POLICIES
+from server import DEFAULT_SOCKET
+
+
+def request(path, message):
+    """
+    Sends one request to the server at path and returns its response.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        connection.sendall((json.dumps(message) + "\n").encode("utf-8"))
+        with connection.makefile("r", encoding="utf-8") as f:
+            return json.loads(f.readline())
+
+
+def print_path(response):
+    """
+    Prints a path response in the format used by degrees.py.
+    """
+    if response["path"] is None:
+        print("Not connected.")
+        return
+    print(f"{response['degrees']} degrees of separation.")
+    previous = response["source"]["name"]
+    for i, step in enumerate(response["path"]):
+        print(f"{i + 1}: {previous} and {step['name']} starred in "
+              f"{step['movie']['title']}")
+        previous = step["name"]
+
+
+def print_people(people):
+    for person in people:
+        print(f"ID: {person['id']}, Name: {person['name']}, "
+              f"Birth: {person['birth']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    path = commands.add_parser("path", help="find degrees of separation")
+    path.add_argument("source")
+    path.add_argument("target")
+    path.add_argument("--policy", choices=POLICIES, default="error",
+                      help="how to resolve names shared by several people")
+
+    lookup = commands.add_parser("lookup", help="search for people by name")
+    lookup.add_argument("name")
+    lookup.add_argument("--mode", choices=("exact", "prefix", "fuzzy"),
+                        default="exact")
+    lookup.add_argument("--limit", type=int, default=10)
+
+    commands.add_parser("stats", help="show server counters")
+
+    args = parser.parse_args()
+    if args.command == "path":
+        message = {"op": "path", "source": args.source,
+                   "target": args.target, "policy": args.policy}
+    elif args.command == "lookup":
+        message = {"op": "lookup", "name": args.name, "mode": args.mode,
+                   "limit": args.limit}
+    else:
+        message = {"op": "stats"}
+
+    try:
+        response = request(args.socket, message)
+    except OSError as e:
+        sys.exit(f"Could not reach server at {args.socket}: {e}")
+
+    if "error" in response:
+        error = response["error"]
+        print(f"{error[0].upper()}{error[1:]}.")
+        if "candidates" in response:
+            print_people(response["candidates"])
+        sys.exit(1)
+    if args.command == "path":
+        print_path(response)
+    elif args.command == "lookup":
+        print_people(response["people"])
+    else:
+        print(json.dumps(response, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,67 +1,99 @@
-import csv
 import sys
 
-from util import Node, StackFrontier , QueueFrontier 
+import paths
+from ingest import format_report, ingest
+from landmarks import load_index
+from nameindex import POLICIES, NameIndex
+from snapshot import fingerprint, load_snapshot, save_snapshot
+from util import Node, StackFrontier , QueueFrontier , LRUCache
 
 # Maps names to a set of corresponding person_ids
 names = {}
 
-# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
+# Maps person_ids to a dictionary of: name, birth
 people = {}
 
-# Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
+# Maps movie_ids to a dictionary of: title, year
 movies = {}
 
+# Integer-indexed adjacency between people and movies
+graph = None
 
-def load_data(directory):
+# Optional landmark distance index over the graph
+landmarks = None
+
+# Prefix and fuzzy name lookup, built on first use
+name_index = None
+
+STRATEGIES = ("bfs", "bidirectional")
+
+# Recently computed co-star sets, keyed on person_id
+neighbor_cache = LRUCache(4096)
+
+# Recently computed paths, keyed on the (source, target) pair in sorted
+# order and stored in that direction
+path_cache = LRUCache(65536)
+
+# Marks a cached result for people who are not connected
+NOT_CONNECTED = object()
+
+
+def load_data(directory, use_snapshot=True):
     """
     Load data from CSV files into memory.
+
+    Returns a report of the rows read and dropped, as built by
+    ingest.ingest, or None if the data came from a snapshot.
+
+    If use_snapshot is True, a binary snapshot of the data is
+    memory-mapped instead when one is up to date with the CSV files,
+    and written after parsing them otherwise.
     """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    global graph, landmarks, name_index, names, people, movies
+
+    # Drop everything derived from any previously loaded dataset
+    landmarks = None
+    name_index = None
+    neighbor_cache.clear()
+    path_cache.clear()
+
+    if use_snapshot:
+        snapshot = load_snapshot(directory)
+        if snapshot is not None:
+            graph, people, movies, names = snapshot
+            return None
+
+    # Fingerprint the files first, so changes made while they are read
+    # leave the snapshot out of date
+    files = fingerprint(directory)
+    graph, people, movies, names, report = ingest(directory)
+
+    if use_snapshot:
+        try:
+            save_snapshot(directory, graph, people, movies, names, files)
+        except OSError:
+            pass
+
+    return report
 
 
 def main():
+    global landmarks
+
     if len(sys.argv) > 2:
         sys.exit("Usage: python degrees.py [directory]")
     directory = sys.argv[1] if len(sys.argv) == 2 else "large"
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    report = load_data(directory)
+    if report is not None:
+        print(f"Read {format_report(report)}.")
     print("Data loaded.")
 
+    # A landmark index, if one was built, rejects unconnected pairs early
+    landmarks = load_index(directory, graph)
+
     source = person_id_for_name(input("Name: "))
     if source is None:
         sys.exit("Person not found.")
@@ -84,55 +116,144 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, strategy="bidirectional", use_cache=True):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
 
-    start_point = Node(state = source, parent = None, action = None)
+    If no possible path, returns None.
+    """
+    if not use_cache:
+        return search(source, target, strategy)
 
-    SPfrontier = QueueFrontier()
-    SPfrontier.add(start_point)
+    # A path cached in the other direction is reversed on the way out
+    key = (source, target) if source <= target else (target, source)
+    path = path_cache.get(key)
+    if path is None:
+        path = search(*key, strategy)
+        if path is None:
+            path = NOT_CONNECTED
+        path_cache.put(key, path)
+    if path is NOT_CONNECTED:
+        return None
+    if key[0] == source:
+        return list(path)
+    return reverse_path(key[0], path)
 
-    parsed = set()
 
-    while True:
-        if SPfrontier.empty():
+def reverse_path(source, path):
+    """
+    Returns a path from source, given as (movie_id, person_id) pairs,
+    reversed to lead from its last person back to source.
+    """
+    people_on_path = [source] + [person_id for _, person_id in path]
+    return [
+        (movie_id, people_on_path[i])
+        for i, (movie_id, _) in reversed(list(enumerate(path)))
+    ]
+
+
+def search(source, target, strategy):
+    """
+    Runs the search for strategy between two person_ids, returning a
+    path of (movie_id, person_id) pairs or None.
+    """
+    source = graph.person_index[source]
+    target = graph.person_index[target]
+    if strategy == "bidirectional":
+        if landmarks is not None and landmarks.bounds(source, target) is None:
+            graph.expanded = 0
             return None
-        else:
-            point = SPfrontier.remove()
-            parsed.add(point.state)
-            for action,state in neighbors_for_person(point.state):
-                if not(SPfrontier.contains_state(state)) and not(state in parsed):
-                    child = Node(state = state, parent = point, action = action)
-                    if child.state == target:
-                        shortest_path = list()
-                        while child.parent != None:
-                            shortest_path.append([child.action, child.state])
-                            child = child.parent
-                        shortest_path.reverse()
-                        return shortest_path
-                    else:
-                        SPfrontier.add(child)
+        path = graph.bidirectional_path(source, target)
+    elif strategy == "bfs":
+        path = breadth_first_path(source, target)
+    else:
+        raise ValueError(f"unknown strategy: {strategy}")
+    if path is None:
+        return None
+    return [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
 
 
+def all_shortest_paths(source, target):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connects the source to the target, generated lazily.
+    """
+    for path in paths.all_shortest_paths(graph, graph.person_index[source],
+                                         graph.person_index[target]):
+        yield [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
 
+
+def count_shortest_paths(source, target):
     """
-    Returns the shortest list of (movie_id, person_id) pairs
-    that connect the source to the target.
+    Returns the number of shortest paths between source and target.
+    """
+    return paths.count_shortest_paths(graph, graph.person_index[source],
+                                      graph.person_index[target])
 
-    If no possible path, returns None.
+
+def k_shortest_paths(source, target, k):
+    """
+    Returns up to k lists of (movie_id, person_id) pairs connecting the
+    source to the target without repeating a person, shortest first.
     """
+    return [
+        [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
+        for path in paths.k_shortest_paths(graph, graph.person_index[source],
+                                           graph.person_index[target], k)
+    ]
 
-    # TODO
-    
 
+def breadth_first_path(source, target):
+    """
+    Returns the shortest list of (movie index, person index) pairs from
+    source to target by expanding a single breadth-first frontier
+    outwards from the source.
+    """
+    graph.expanded = 0
+    if source == target:
+        return []
+
+    start_point = Node(state = source, parent = None, action = None)
 
-    raise NotImplementedError
+    SPfrontier = QueueFrontier()
+    SPfrontier.add(start_point)
 
+    parsed = set()
 
-def person_id_for_name(name):
+    while True:
+        if SPfrontier.empty():
+            return None
+        else:
+            point = SPfrontier.remove()
+            parsed.add(point.state)
+            graph.expanded += 1
+            for action in graph.movies_of(point.state):
+                for state in graph.stars_of(action):
+                    if not(SPfrontier.contains_state(state)) and not(state in parsed):
+                        child = Node(state = state, parent = point, action = action)
+                        if child.state == target:
+                            shortest_path = list()
+                            while child.parent != None:
+                                shortest_path.append((child.action, child.state))
+                                child = child.parent
+                            shortest_path.reverse()
+                            return shortest_path
+                        else:
+                            SPfrontier.add(child)
+
+
+def person_id_for_name(name, policy="prompt"):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    Ambiguous names are resolved by asking the user under the "prompt"
+    policy, and otherwise by one of the nameindex.POLICIES.
     """
+    if policy != "prompt":
+        return get_name_index().resolve(name, policy)
+
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
         return None
@@ -154,19 +275,63 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def resolve_person(person, policy):
+    """
+    Returns the person_id for a person given by ID or by name, choosing
+    between people sharing a name by one of the nameindex.POLICIES.
+
+    Raises ValueError for an unknown policy, LookupError if no person
+    matches, and AmbiguousName for a shared name under "error".
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"unknown policy: {policy}")
+    if person in people:
+        return person
+    person_id = person_id_for_name(person, policy)
+    if person_id is None:
+        raise LookupError(f"person not found: {person}")
+    return person_id
+
+
+def get_name_index():
+    """
+    Returns the name index for the loaded data, building it if needed.
+    """
+    global name_index
+    if name_index is None:
+        name_index = NameIndex(names, people, graph)
+    return name_index
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
+    neighbors = neighbor_cache.get(person_id)
+    if neighbors is not None:
+        return neighbors
+
     neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
+    for m in graph.movies_of(graph.person_index[person_id]):
+        movie_id = graph.movie_ids[m]
+        for p in graph.stars_of(m):
+            neighbors.add((movie_id, graph.person_ids[p]))
+    neighbors = frozenset(neighbors)
+    neighbor_cache.put(person_id, neighbors)
     return neighbors
 
 
+def cache_info():
+    """
+    Returns hit, miss and size counters for the neighbor and path caches.
+    """
+    return {
+        "neighbors": neighbor_cache.info(),
+        "paths": path_cache.info()
+    }
+
+
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,191 @@
+"""
+Compact integer-indexed graph of people and the movies they starred in.
+"""
+
+import itertools
+from array import array
+
+
+class Graph():
+    """
+    People and movies interned to dense integer indices, with
+    person -> movie and movie -> person adjacency kept in CSR form.
+
+    The movies of person p are
+    person_movies[person_offsets[p]:person_offsets[p + 1]], and the
+    stars of movie m are movie_people[movie_offsets[m]:movie_offsets[m + 1]].
+    """
+
+    def __init__(self, person_ids, movie_ids, person_offsets, person_movies,
+                 movie_offsets, movie_people, person_index=None,
+                 movie_index=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        if person_index is None:
+            person_index = {
+                person_id: i for i, person_id in enumerate(person_ids)
+            }
+        if movie_index is None:
+            movie_index = {
+                movie_id: i for i, movie_id in enumerate(movie_ids)
+            }
+        self.person_index = person_index
+        self.movie_index = movie_index
+
+        # Number of people expanded by the most recent search
+        self.expanded = 0
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+    @classmethod
+    def from_edges(cls, person_ids, movie_ids, edge_people, edge_movies,
+                   person_index=None, movie_index=None):
+        """
+        Builds a graph from parallel arrays of (person index, movie index)
+        star edges. Duplicate edges are dropped.
+        """
+        person_offsets, person_movies = build_csr(
+            len(person_ids), edge_people, edge_movies
+        )
+        movie_offsets, movie_people = build_csr(
+            len(movie_ids), edge_movies, edge_people
+        )
+        return cls(person_ids, movie_ids, person_offsets, person_movies,
+                   movie_offsets, movie_people, person_index, movie_index)
+
+    def movies_of(self, p):
+        """
+        Returns the movie indices person p starred in.
+        """
+        return self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+
+    def stars_of(self, m):
+        """
+        Returns the person indices who starred in movie m.
+        """
+        return self.movie_people[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+
+    def degree(self, p):
+        """
+        Returns the number of movies person p starred in.
+        """
+        return self.person_offsets[p + 1] - self.person_offsets[p]
+
+    def bidirectional_path(self, source, target):
+        """
+        Returns the shortest list of (movie index, person index) pairs
+        from source to target, growing breadth-first frontiers from both
+        ends and joining them where they meet.
+
+        If no possible path, returns None.
+        """
+        self.expanded = 0
+        if source == target:
+            return []
+
+        # Each side maps reached people to the person and movie that
+        # reached them, pointing back towards that side's starting person
+        forward_person, forward_movie = {source: -1}, {}
+        backward_person, backward_movie = {target: -1}, {}
+        forward_seen, backward_seen = set(), set()
+        forward_layer, backward_layer = [source], [target]
+
+        while forward_layer and backward_layer:
+
+            # Grow whichever frontier is currently smaller
+            if len(forward_layer) <= len(backward_layer):
+                forward_layer, meeting = self.expand_layer(
+                    forward_layer, forward_person, forward_movie,
+                    forward_seen, backward_person
+                )
+            else:
+                backward_layer, meeting = self.expand_layer(
+                    backward_layer, backward_person, backward_movie,
+                    backward_seen, forward_person
+                )
+            if meeting is not None:
+                return self.join_paths(forward_person, forward_movie,
+                                       backward_person, backward_movie,
+                                       meeting)
+
+        return None
+
+    def expand_layer(self, layer, parent_person, parent_movie, movies_seen,
+                     other):
+        """
+        Expands every person in a breadth-first layer, recording parents
+        for newly reached people. Movies already expanded by this search
+        are skipped, since all of their stars have been reached.
+
+        Returns the next layer and the first person found in other, or
+        None if no such person was reached.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+
+        next_layer = []
+        self.expanded += len(layer)
+        for p in layer:
+            for i in range(person_offsets[p], person_offsets[p + 1]):
+                m = person_movies[i]
+                if m in movies_seen:
+                    continue
+                movies_seen.add(m)
+                for j in range(movie_offsets[m], movie_offsets[m + 1]):
+                    q = movie_people[j]
+                    if q in parent_person:
+                        continue
+                    parent_person[q] = p
+                    parent_movie[q] = m
+                    if q in other:
+                        return next_layer, q
+                    next_layer.append(q)
+        return next_layer, None
+
+    def join_paths(self, forward_person, forward_movie, backward_person,
+                   backward_movie, meeting):
+        """
+        Joins the forward and backward parent chains through the meeting
+        person into a single list of (movie index, person index) pairs.
+        """
+        path = []
+        p = meeting
+        while forward_person[p] != -1:
+            path.append((forward_movie[p], p))
+            p = forward_person[p]
+        path.reverse()
+
+        p = meeting
+        while backward_person[p] != -1:
+            path.append((backward_movie[p], backward_person[p]))
+            p = backward_person[p]
+        return path
+
+
+def build_csr(size, sources, targets):
+    """
+    Returns (offsets, indices) arrays grouping the distinct targets of
+    each source in ascending order, for sources numbered 0 to size - 1.
+    """
+    counts = array("q", bytes(8 * (size + 1)))
+    for s in sources:
+        counts[s + 1] += 1
+    offsets = array("q", itertools.accumulate(counts))
+
+    indices = array("i", bytes(4 * len(targets)))
+    fill = array("q", offsets)
+    for s, t in zip(sources, targets):
+        indices[fill[s]] = t
+        fill[s] += 1
+
+    # Drop repeated targets within each group
+    unique = array("i")
+    unique_offsets = array("q", [0])
+    for s in range(size):
+        unique.extend(sorted(set(indices[offsets[s]:offsets[s + 1]])))
+        unique_offsets.append(len(unique))
+    return unique_offsets, unique
@@ -0,0 +1,183 @@
+"""
+Streaming CSV ingest for degrees datasets.
+
+Each file is read row by row with a positional csv.reader, so memory
+grows only with the data kept. People and movies are independent and
+are read concurrently before stars, which need both of them. Rows that
+cannot be used are counted in a report rather than silently dropped.
+"""
+
+import csv
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from graph import Graph
+
+# Report entries counting rows that were dropped or left unconnected
+DROPPED = (
+    "malformed_rows",
+    "duplicate_people",
+    "duplicate_movies",
+    "unknown_person_stars",
+    "unknown_movie_stars",
+    "duplicate_stars",
+    "people_without_movies",
+    "movies_without_stars",
+)
+
+
+def columns(header, filename, *names):
+    """
+    Returns the positions of the named columns in a CSV header row.
+    """
+    try:
+        return [header.index(name) for name in names]
+    except ValueError:
+        raise ValueError(f"{filename}: expected columns {', '.join(names)}")
+
+
+def read_people(directory, report):
+    """
+    Returns (people, names) dictionaries read from people.csv.
+    """
+    people = {}
+    names = {}
+    filename = f"{directory}/people.csv"
+    with open(filename, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        id_column, name_column, birth_column = columns(
+            next(reader), filename, "id", "name", "birth"
+        )
+        width = max(id_column, name_column, birth_column) + 1
+        for row in reader:
+            if len(row) < width:
+                report["malformed_rows"] += 1
+                continue
+            person_id = row[id_column]
+            if person_id in people:
+                report["duplicate_people"] += 1
+                continue
+            name = row[name_column]
+            people[person_id] = {
+                "name": name,
+                "birth": row[birth_column]
+            }
+            key = name.lower()
+            if key in names:
+                names[key].add(person_id)
+            else:
+                names[key] = {person_id}
+    return people, names
+
+
+def read_movies(directory, report):
+    """
+    Returns the movies dictionary read from movies.csv.
+    """
+    movies = {}
+    filename = f"{directory}/movies.csv"
+    with open(filename, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        id_column, title_column, year_column = columns(
+            next(reader), filename, "id", "title", "year"
+        )
+        width = max(id_column, title_column, year_column) + 1
+        for row in reader:
+            if len(row) < width:
+                report["malformed_rows"] += 1
+                continue
+            movie_id = row[id_column]
+            if movie_id in movies:
+                report["duplicate_movies"] += 1
+                continue
+            movies[movie_id] = {
+                "title": row[title_column],
+                "year": row[year_column]
+            }
+    return movies
+
+
+def read_stars(directory, person_index, movie_index, report):
+    """
+    Returns parallel arrays of the person and movie indices of each
+    usable row in stars.csv.
+    """
+    edge_people = array("i")
+    edge_movies = array("i")
+    filename = f"{directory}/stars.csv"
+    with open(filename, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        person_column, movie_column = columns(
+            next(reader), filename, "person_id", "movie_id"
+        )
+        width = max(person_column, movie_column) + 1
+        for row in reader:
+            if len(row) < width:
+                report["malformed_rows"] += 1
+                continue
+            p = person_index.get(row[person_column])
+            m = movie_index.get(row[movie_column])
+            if p is None:
+                report["unknown_person_stars"] += 1
+            elif m is None:
+                report["unknown_movie_stars"] += 1
+            else:
+                edge_people.append(p)
+                edge_movies.append(m)
+    return edge_people, edge_movies
+
+
+def ingest(directory):
+    """
+    Reads a dataset directory.
+
+    Returns (graph, people, movies, names, report), where report counts
+    the rows read and every row dropped, by reason.
+    """
+    # Each reader counts into its own report, merged once both are done
+    people_report, movies_report, report = Counter(), Counter(), Counter()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        people_future = executor.submit(read_people, directory, people_report)
+        movies_future = executor.submit(read_movies, directory, movies_report)
+        people, names = people_future.result()
+        movies = movies_future.result()
+    report.update(people_report)
+    report.update(movies_report)
+
+    person_ids = list(people)
+    movie_ids = list(movies)
+    person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+    movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+    edge_people, edge_movies = read_stars(
+        directory, person_index, movie_index, report
+    )
+    graph = Graph.from_edges(person_ids, movie_ids, edge_people, edge_movies,
+                             person_index, movie_index)
+
+    report["people"] = len(person_ids)
+    report["movies"] = len(movie_ids)
+    report["stars"] = len(graph.person_movies)
+    report["duplicate_stars"] = len(edge_people) - len(graph.person_movies)
+    report["people_without_movies"] = sum(
+        1 for p in range(len(person_ids)) if graph.degree(p) == 0
+    )
+    report["movies_without_stars"] = sum(
+        1 for m in range(len(movie_ids))
+        if graph.movie_offsets[m] == graph.movie_offsets[m + 1]
+    )
+    return graph, people, movies, names, report
+
+
+def format_report(report):
+    """
+    Returns a one-line summary of an ingest report.
+    """
+    dropped = ", ".join(
+        f"{report[reason]} {reason.replace('_', ' ')}"
+        for reason in DROPPED
+        if report[reason]
+    )
+    summary = (f"{report['people']} people, {report['movies']} movies, "
+               f"{report['stars']} stars")
+    return f"{summary} ({dropped})" if dropped else summary
@@ -0,0 +1,274 @@
+"""
+Landmark distance index bounding degrees between people.
+
+A handful of high-degree landmark people are chosen and the distance
+from each of them to every person is stored. By the triangle inequality,
+|d(L, t) - d(L, s)| <= d(s, t) <= d(L, s) + d(L, t) for every landmark
+L, which bounds the degrees between any two people and lets
+disconnected pairs be rejected without searching at all.
+
+The index is saved as landmarks.index next to the dataset. When rows are
+only appended to stars.csv, the stored distances are repaired in place
+rather than recomputed.
+
+Usage: python landmarks.py [directory] [--count N]
+"""
+
+import argparse
+import csv
+import heapq
+import io
+import json
+import os
+import zlib
+from array import array
+
+from ingest import columns
+from snapshot import fingerprint
+
+MAGIC = b"DEGLMK01"
+FILENAME = "landmarks.index"
+
+# Distance stored for people a landmark cannot reach
+UNREACHED = 0xFFFF
+
+
+class LandmarkIndex():
+    """
+    Distances from a set of landmark people to every person in a graph.
+    """
+
+    def __init__(self, graph, landmarks, distances):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, count=16):
+        """
+        Builds an index over graph using up to count landmarks, picked by
+        number of movies while skipping direct co-stars of those already
+        picked so the landmarks spread across the graph.
+        """
+        order = sorted(range(len(graph.person_ids)), key=graph.degree,
+                       reverse=True)
+        landmarks = []
+        covered = set()
+        for p in order:
+            if len(landmarks) == count:
+                break
+            if p in covered:
+                continue
+            landmarks.append(p)
+            for m in graph.movies_of(p):
+                covered.update(graph.stars_of(m))
+        distances = [distances_from(graph, p) for p in landmarks]
+        return cls(graph, landmarks, distances)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the number of degrees between
+        source and target. Returns None if a landmark proves they are
+        not connected. The upper bound is None if no landmark reaches
+        both of them.
+        """
+        lower = 0
+        upper = None
+        for distance in self.distances:
+            s, t = distance[source], distance[target]
+            if (s == UNREACHED) != (t == UNREACHED):
+                return None
+            if s == UNREACHED:
+                continue
+            lower = max(lower, abs(s - t))
+            if upper is None or s + t < upper:
+                upper = s + t
+        return lower, upper
+
+    def update(self, edges):
+        """
+        Repairs the stored distances after (person index, movie index)
+        star edges have been added to the graph.
+        """
+        graph = self.graph
+        for distance in self.distances:
+            changed = []
+            for p, m in edges:
+                stars = graph.stars_of(m)
+                nearest = min(distance[q] for q in stars)
+                if nearest != UNREACHED and nearest + 1 < distance[p]:
+                    distance[p] = nearest + 1
+                    changed.append((distance[p], p))
+                if distance[p] == UNREACHED:
+                    continue
+                for q in stars:
+                    if distance[p] + 1 < distance[q]:
+                        distance[q] = distance[p] + 1
+                        changed.append((distance[q], q))
+
+            # Propagate the shortened distances outwards
+            heapq.heapify(changed)
+            while changed:
+                d, p = heapq.heappop(changed)
+                if d > distance[p]:
+                    continue
+                for m in graph.movies_of(p):
+                    for q in graph.stars_of(m):
+                        if d + 1 < distance[q]:
+                            distance[q] = d + 1
+                            heapq.heappush(changed, (d + 1, q))
+
+    def save(self, directory):
+        """
+        Writes the index to directory, recording the state of the CSV
+        files it describes.
+        """
+        header = json.dumps({
+            "landmarks": [self.graph.person_ids[p] for p in self.landmarks],
+            "people": len(self.graph.person_ids),
+            "files": fingerprint(directory),
+            "stars_checksum": stars_checksum(directory)
+        }).encode("utf-8")
+
+        path = os.path.join(directory, FILENAME)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for distance in self.distances:
+                f.write(distance.tobytes())
+        os.replace(temporary, path)
+
+
+def distances_from(graph, source):
+    """
+    Returns an array of the degrees from source to every person.
+    """
+    distance = array("H", [UNREACHED]) * len(graph.person_ids)
+    distance[source] = 0
+    movies_seen = set()
+    layer = [source]
+    depth = 0
+    while layer:
+        depth += 1
+        next_layer = []
+        for p in layer:
+            for m in graph.movies_of(p):
+                if m in movies_seen:
+                    continue
+                movies_seen.add(m)
+                for q in graph.stars_of(m):
+                    if distance[q] == UNREACHED:
+                        distance[q] = depth
+                        next_layer.append(q)
+        layer = next_layer
+    return distance
+
+
+def stars_checksum(directory, size=None):
+    """
+    Returns the CRC-32 of the first size bytes of stars.csv, or of the
+    whole file if size is None.
+    """
+    with open(os.path.join(directory, "stars.csv"), "rb") as f:
+        return zlib.crc32(f.read(size if size is not None else -1))
+
+
+def load_index(directory, graph):
+    """
+    Returns the landmark index saved in directory for graph, repairing
+    it first if rows have been appended to stars.csv since it was built.
+
+    Returns None if there is no index, or if the dataset has changed in
+    any other way and the index must be rebuilt.
+    """
+    path = os.path.join(directory, FILENAME)
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            header = json.loads(f.read(int.from_bytes(f.read(8), "little")))
+            data = f.read()
+        files = fingerprint(directory)
+        stored = header["files"]
+        people = header["people"]
+        landmark_ids = header["landmarks"]
+        checksum = header["stars_checksum"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    # People and movies fix the person numbering, so must be unchanged
+    for filename in ("people.csv", "movies.csv"):
+        if files[filename] != stored.get(filename):
+            return None
+    if (people != len(graph.person_ids)
+            or len(data) != 2 * people * len(landmark_ids)):
+        return None
+    landmarks = []
+    for person_id in landmark_ids:
+        if person_id not in graph.person_index:
+            return None
+        landmarks.append(graph.person_index[person_id])
+
+    distances = []
+    for i in range(len(landmarks)):
+        distance = array("H")
+        distance.frombytes(data[2 * people * i:2 * people * (i + 1)])
+        distances.append(distance)
+    index = LandmarkIndex(graph, landmarks, distances)
+    if files == stored:
+        return index
+
+    # Repair the index if stars.csv has only grown by appended rows
+    try:
+        size = stored["stars.csv"][1]
+    except (KeyError, IndexError, TypeError):
+        return None
+    if (files["stars.csv"][1] < size
+            or stars_checksum(directory, size) != checksum):
+        return None
+    filename = os.path.join(directory, "stars.csv")
+    with open(filename, "rb") as f:
+        first_line = f.readline().decode("utf-8")
+        f.seek(size)
+        appended = f.read().decode("utf-8")
+    try:
+        person_column, movie_column = columns(
+            next(csv.reader(io.StringIO(first_line))), filename,
+            "person_id", "movie_id"
+        )
+    except (StopIteration, ValueError):
+        return None
+    edges = []
+    for row in csv.reader(io.StringIO(appended)):
+        try:
+            edges.append((graph.person_index[row[person_column]],
+                          graph.movie_index[row[movie_column]]))
+        except (IndexError, KeyError):
+            continue
+    index.update(edges)
+    index.save(directory)
+    return index
+
+
+def main():
+    import degrees
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--count", type=int, default=16,
+                        help="number of landmarks to pick")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_data(args.directory)
+    print("Building landmark index...")
+    index = LandmarkIndex.build(degrees.graph, args.count)
+    index.save(args.directory)
+    print(f"Saved {len(index.landmarks)} landmarks to "
+          f"{os.path.join(args.directory, FILENAME)}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Name lookup for degrees datasets without interactive prompts.
+
+Names are matched exactly, by prefix through binary search over the
+sorted lowercase names, or fuzzily through an index of character
+trigrams. Matching people are ranked, and ambiguous names are resolved
+by a policy instead of asking the user.
+"""
+
+import bisect
+import heapq
+import itertools
+from array import array
+
+# Ways to choose between several people matching a name
+POLICIES = ("most_movies", "oldest", "youngest", "error")
+
+
+class AmbiguousName(Exception):
+    """
+    Raised when a name matches several people under the "error" policy.
+    """
+
+    def __init__(self, name, person_ids):
+        super().__init__(f"ambiguous name: {name}")
+        self.name = name
+        self.person_ids = person_ids
+
+
+class NameIndex():
+    """
+    Prefix and trigram indexes over a names dictionary mapping lowercase
+    names to sets of person_ids.
+    """
+
+    def __init__(self, names, people, graph):
+        self.names = names
+        self.people = people
+        self.graph = graph
+        self.keys = sorted(names)
+
+        # Number of trigrams in each name, by position in keys
+        self.sizes = array("H", (len(trigrams(key)) for key in self.keys))
+        self.max_size = max(self.sizes, default=0)
+
+        # Maps each trigram to the positions in keys of names containing
+        # it, ordered by the number of trigrams in those names
+        self.trigrams = {}
+        order = sorted(range(len(self.keys)), key=self.sizes.__getitem__)
+        for i in order:
+            for trigram in trigrams(self.keys[i]):
+                if trigram not in self.trigrams:
+                    self.trigrams[trigram] = array("i")
+                self.trigrams[trigram].append(i)
+
+    def rank(self, person_ids, policy="most_movies", limit=None):
+        """
+        Returns person_ids ordered best first under policy, or only the
+        best limit of them. People with an unknown birth year sort last
+        under "oldest" and "youngest", and "error" ranks as "most_movies".
+        Raises ValueError for an unknown policy.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"unknown policy: {policy}")
+
+        def movie_count(person_id):
+            return self.graph.degree(self.graph.person_index[person_id])
+
+        def birth(person_id):
+            try:
+                return int(self.people[person_id]["birth"])
+            except ValueError:
+                return None
+
+        if policy == "oldest":
+            def key(person_id):
+                year = birth(person_id)
+                return (year is None, year or 0, -movie_count(person_id))
+        elif policy == "youngest":
+            def key(person_id):
+                year = birth(person_id)
+                return (year is None, -(year or 0), -movie_count(person_id))
+        else:
+            def key(person_id):
+                return (-movie_count(person_id), person_id)
+        if limit is None:
+            return sorted(person_ids, key=key)
+        return heapq.nsmallest(limit, person_ids, key=key)
+
+    def resolve(self, name, policy="most_movies"):
+        """
+        Returns the person_id for an exact name, choosing between several
+        matching people by policy, or None if nobody has that name.
+        Raises AmbiguousName under the "error" policy, and ValueError for
+        an unknown policy.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"unknown policy: {policy}")
+        person_ids = self.names.get(name.lower(), set())
+        if len(person_ids) == 0:
+            return None
+        if len(person_ids) == 1:
+            return next(iter(person_ids))
+        if policy == "error":
+            raise AmbiguousName(name, self.rank(person_ids))
+        return self.rank(person_ids, policy, 1)[0]
+
+    def prefix(self, text, limit=10, policy="most_movies"):
+        """
+        Returns up to limit person_ids whose name starts with text, in
+        alphabetical order of name and ranked by policy among people
+        with the same name.
+        """
+        text = text.lower()
+        person_ids = []
+        i = bisect.bisect_left(self.keys, text)
+        while (len(person_ids) < limit and i < len(self.keys)
+               and self.keys[i].startswith(text)):
+            person_ids.extend(self.rank(self.names[self.keys[i]], policy,
+                                        limit - len(person_ids)))
+            i += 1
+        return person_ids
+
+    def fuzzy(self, text, limit=10, policy="most_movies"):
+        """
+        Returns up to limit person_ids whose names share the most
+        trigrams with text, closest first and ranked by policy among
+        people with the same name. Names sharing fewer than half of the
+        trigrams of text are not matched.
+        """
+        query = trigrams(text.lower())
+        if limit <= 0:
+            return []
+
+        # A name sharing at least half of the query's trigrams must
+        # contain one of its rarest ones, so only those are scanned
+        rarest = sorted(query, key=lambda t: len(self.trigrams.get(t, ())))
+        needed = (len(query) + 1) // 2
+        scanned = [
+            self.trigrams[trigram]
+            for trigram in rarest[:len(query) - needed + 1]
+            if trigram in self.trigrams
+        ]
+
+        def bound(size):
+            """
+            Returns the highest Dice similarity a name with size
+            trigrams can have with text.
+            """
+            return 2 * min(len(query), size) / (len(query) + size)
+
+        # Score names in decreasing order of their best possible
+        # similarity, stopping once no remaining name can beat the worst
+        # of the best limit names found so far
+        best = []
+        seen = set()
+        size_of = self.sizes.__getitem__
+        for size in sorted(range(needed, self.max_size + 1), key=bound,
+                           reverse=True):
+            if len(best) == limit and best[0][0] >= bound(size):
+                break
+            candidates = itertools.chain.from_iterable(
+                positions[bisect.bisect_left(positions, size, key=size_of):
+                          bisect.bisect_right(positions, size, key=size_of)]
+                for positions in scanned
+            )
+            for i in candidates:
+                if i in seen:
+                    continue
+                seen.add(i)
+                shared = len(query & trigrams(self.keys[i]))
+                if shared < needed:
+                    continue
+                score = 2 * shared / (len(query) + size)
+                if len(best) < limit:
+                    heapq.heappush(best, (score, -i))
+                elif score > best[0][0]:
+                    heapq.heapreplace(best, (score, -i))
+                if len(best) == limit and best[0][0] >= bound(size):
+                    break
+
+        # Each name has at least one person, so limit names are enough
+        person_ids = []
+        for score, i in sorted(best, reverse=True):
+            person_ids.extend(self.rank(self.names[self.keys[-i]], policy,
+                                        limit - len(person_ids)))
+        return person_ids[:limit]
+
+
+def trigrams(text):
+    """
+    Returns the set of character trigrams of text, padded so that short
+    names and word boundaries still produce trigrams.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
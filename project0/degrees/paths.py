@@ -0,0 +1,166 @@
+"""
+Enumeration of several paths between two people in a Graph.
+
+Paths are lists of (movie index, person index) steps, as returned by
+Graph.bidirectional_path. Two people who starred together in several
+movies are joined by one step per movie, so paths that differ only in
+the movie connecting the same two people count as different paths.
+"""
+
+import heapq
+
+
+def layers(graph, source, target):
+    """
+    Runs a breadth-first search from source that stops once target's
+    layer is reached.
+
+    Returns (distance, count) dictionaries, giving each reached person's
+    distance from source and number of shortest paths from source.
+    """
+    distance = {source: 0}
+    count = {source: 1}
+    layer = [source]
+    depth = 0
+    while layer and target not in distance:
+        depth += 1
+        next_layer = []
+        for p in layer:
+            for m in graph.movies_of(p):
+                for q in graph.stars_of(m):
+                    if q not in distance:
+                        distance[q] = depth
+                        count[q] = 0
+                        next_layer.append(q)
+                    if distance[q] == depth:
+                        count[q] += count[p]
+        layer = next_layer
+    return distance, count
+
+
+def count_shortest_paths(graph, source, target):
+    """
+    Returns the number of shortest paths from source to target.
+    """
+    _, count = layers(graph, source, target)
+    return count.get(target, 0)
+
+
+def all_shortest_paths(graph, source, target):
+    """
+    Yields every shortest path from source to target.
+
+    Paths are generated lazily by walking back from target through the
+    breadth-first layers. Only the layer distances and the current path
+    are held in memory, never the set of paths.
+    """
+    distance, _ = layers(graph, source, target)
+    if target not in distance:
+        return
+
+    def steps_back(p):
+        """
+        Yields the steps into p from people one layer closer to source.
+        """
+        d = distance[p] - 1
+        for m in graph.movies_of(p):
+            for q in graph.stars_of(m):
+                if distance.get(q) == d:
+                    yield m, q
+
+    if source == target:
+        yield []
+        return
+
+    # path holds the steps walked back from target, last step first,
+    # and stack the people on it with their untried steps back
+    path = []
+    stack = [(target, steps_back(target))]
+    while stack:
+        person, steps = stack[-1]
+        step = next(steps, None)
+        if step is None:
+            stack.pop()
+            if stack:
+                path.pop()
+            continue
+        m, q = step
+        path.append((m, person))
+        if q == source:
+            yield path[::-1]
+            path.pop()
+        else:
+            stack.append((q, steps_back(q)))
+
+
+def constrained_path(graph, source, target, banned_people, banned_steps):
+    """
+    Returns the shortest path from source to target avoiding
+    banned_people, and not taking any of banned_steps out of source.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+    parent = {source: None}
+    layer = [source]
+    while layer:
+        next_layer = []
+        for p in layer:
+            for m in graph.movies_of(p):
+                for q in graph.stars_of(m):
+                    if q in parent or q in banned_people:
+                        continue
+                    if p == source and (m, q) in banned_steps:
+                        continue
+                    parent[q] = (m, p)
+                    if q == target:
+                        path = []
+                        while parent[q] is not None:
+                            m, p = parent[q]
+                            path.append((m, q))
+                            q = p
+                        path.reverse()
+                        return path
+                    next_layer.append(q)
+        layer = next_layer
+    return None
+
+
+def k_shortest_paths(graph, source, target, k):
+    """
+    Returns up to k shortest paths from source to target that never
+    visit the same person twice, shortest first, using Yen's algorithm.
+    """
+    first = graph.bidirectional_path(source, target)
+    if first is None or k < 1:
+        return []
+    found = [first]
+    candidates = []
+    seen = {tuple(first)}
+
+    while len(found) < k:
+        previous = found[-1]
+        people_on_path = [source] + [p for _, p in previous]
+
+        # Branch off the previous path at each of its people in turn
+        for i in range(len(previous)):
+            spur = people_on_path[i]
+            root = previous[:i]
+            banned_steps = {
+                path[i] for path in found if path[:i] == root
+            }
+            banned_people = set(people_on_path[:i])
+            spur_path = constrained_path(graph, spur, target,
+                                         banned_people, banned_steps)
+            if spur_path is None:
+                continue
+            candidate = root + spur_path
+            if tuple(candidate) not in seen:
+                seen.add(tuple(candidate))
+                heapq.heappush(candidates, (len(candidate), candidate))
+
+        if not candidates:
+            break
+        found.append(heapq.heappop(candidates)[1])
+    return found
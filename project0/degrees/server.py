@@ -0,0 +1,234 @@
+"""
+Long-running degrees query server on a Unix domain socket.
+
+The dataset is loaded once. Clients send one JSON request per line and
+receive one JSON response per line:
+
+    {"op": "path", "source": "Kevin Bacon", "target": "Tom Hanks"}
+    {"op": "lookup", "name": "kevin b", "mode": "prefix"}
+    {"op": "stats"}
+
+People may be given by ID or by name. Ambiguous names are resolved by an
+optional "policy" field, one of nameindex.POLICIES, or reported back
+with the matching IDs. Path searches and name lookups run in a pool of
+worker processes forked after loading, so they share the loaded data
+copy-on-write and never block the event loop.
+
+Usage: python server.py [directory] [--socket PATH] [--workers N]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import degrees
+from landmarks import load_index
+from nameindex import POLICIES, AmbiguousName
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "degrees.sock")
+
+
+class Counters():
+    """
+    Request counts and latencies per operation since the server started.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.operations = {}
+
+    def record(self, op, seconds, ok):
+        counts = self.operations.setdefault(
+            op, {"requests": 0, "errors": 0, "total_seconds": 0.0,
+                 "max_seconds": 0.0}
+        )
+        counts["requests"] += 1
+        counts["errors"] += not ok
+        counts["total_seconds"] += seconds
+        counts["max_seconds"] = max(counts["max_seconds"], seconds)
+
+    def snapshot(self):
+        uptime = time.monotonic() - self.started
+        operations = {}
+        for op, counts in self.operations.items():
+            operations[op] = dict(
+                counts,
+                mean_ms=counts["total_seconds"] / counts["requests"] * 1000,
+                per_second=counts["requests"] / uptime
+            )
+        return {"uptime_seconds": uptime, "operations": operations}
+
+
+def describe(person_id):
+    """
+    Returns a JSON-ready description of a person.
+    """
+    person = degrees.people[person_id]
+    return {"id": person_id, "name": person["name"], "birth": person["birth"]}
+
+
+def field(request, name, kind, default=None):
+    """
+    Returns a field of a request, or default if it is missing.
+    Raises TypeError if the field is not of the given kind.
+    """
+    value = request.get(name, default)
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise TypeError(f"{name} must be {kind.__name__}")
+    return value
+
+
+def find_path(source, target):
+    """
+    Runs a shortest path search in a worker process.
+    """
+    return degrees.shortest_path(source, target)
+
+
+def find_people(name, mode, limit):
+    """
+    Runs a name lookup in a worker process.
+    """
+    index = degrees.get_name_index()
+    if mode == "exact":
+        return index.rank(degrees.names.get(name.lower(), set()), limit=limit)
+    elif mode == "prefix":
+        return index.prefix(name, limit)
+    return index.fuzzy(name, limit)
+
+
+class Server():
+    """
+    Answers requests from clients, handing searches to a process pool.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.counters = Counters()
+
+    async def path(self, request):
+        policy = field(request, "policy", str, "error")
+        if policy not in POLICIES:
+            raise ValueError(f"unknown policy: {policy}")
+        source = degrees.resolve_person(field(request, "source", str), policy)
+        target = degrees.resolve_person(field(request, "target", str), policy)
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(self.pool, find_path, source, target)
+        if path is None:
+            return {"source": describe(source), "target": describe(target),
+                    "degrees": None, "path": None}
+        return {
+            "source": describe(source),
+            "target": describe(target),
+            "degrees": len(path),
+            "path": [
+                dict(describe(person_id), movie={
+                    "id": movie_id, "title": degrees.movies[movie_id]["title"]
+                })
+                for movie_id, person_id in path
+            ]
+        }
+
+    async def lookup(self, request):
+        name = field(request, "name", str)
+        mode = field(request, "mode", str, "exact")
+        limit = field(request, "limit", int, 10)
+        if mode not in ("exact", "prefix", "fuzzy"):
+            raise ValueError(f"unknown lookup mode: {mode}")
+        if limit < 0:
+            raise ValueError("limit must not be negative")
+        loop = asyncio.get_running_loop()
+        person_ids = await loop.run_in_executor(self.pool, find_people,
+                                                name, mode, limit)
+        return {"people": [describe(person_id) for person_id in person_ids]}
+
+    async def stats(self, request):
+        return self.counters.snapshot()
+
+    async def handle(self, line):
+        """
+        Returns the JSON response line for a request line.
+        """
+        start = time.perf_counter()
+        op = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise TypeError("request must be a JSON object")
+            if request.get("op") not in ("path", "lookup", "stats"):
+                raise ValueError(f"unknown op: {request.get('op')}")
+            op = request["op"]
+            response = await getattr(self, op)(request)
+            ok = True
+        except AmbiguousName as e:
+            response = {"error": str(e), "candidates": [
+                describe(person_id) for person_id in e.person_ids
+            ]}
+            ok = False
+        except (LookupError, ValueError, TypeError) as e:
+            response = {"error": str(e)}
+            ok = False
+        except Exception as e:
+            response = {"error": f"internal error: {e!r}"}
+            ok = False
+        self.counters.record(op or "invalid", time.perf_counter() - start, ok)
+        return json.dumps(response) + "\n"
+
+    async def serve_client(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                writer.write((await self.handle(line)).encode("utf-8"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(path, pool):
+    server = Server(pool)
+    unix_server = await asyncio.start_unix_server(server.serve_client, path)
+    print(f"Listening on {path}.", file=sys.stderr)
+    async with unix_server:
+        await unix_server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(args.directory)
+    degrees.landmarks = load_index(args.directory, degrees.graph)
+    degrees.get_name_index()
+    print("Data loaded.", file=sys.stderr)
+
+    # Fork the workers now, before the event loop starts, so that each
+    # one inherits the loaded data and no loop state
+    pool = ProcessPoolExecutor(args.workers,
+                               mp_context=multiprocessing.get_context("fork"))
+    pool.submit(int).result()
+
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+    try:
+        asyncio.run(serve(args.socket, pool))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown(cancel_futures=True)
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Binary snapshot of a loaded degrees dataset.
+
+A snapshot holds the graph's CSR arrays and every ID, name, birth year,
+title and release year of the dataset as flat arrays, each aligned so it
+can be memory-mapped and used in place. Strings are kept as tables of
+UTF-8 text and offsets, and IDs and names are looked up by binary search
+over arrays sorted once when the snapshot is written, so loading builds
+no Python objects for the rows and runs no code from the file. It
+records the mtime and size of the CSV files it was built from and is
+ignored once any of them change.
+"""
+
+import bisect
+import json
+import mmap
+import os
+from array import array
+from collections.abc import Mapping, Sequence
+
+from graph import Graph
+
+MAGIC = b"DEGSNAP2"
+FILENAME = "degrees.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_people")
+PERSON_FIELDS = ("name", "birth")
+MOVIE_FIELDS = ("title", "year")
+
+
+class StringTable(Sequence):
+    """
+    Read-only sequence of strings, stored as their concatenated UTF-8
+    text and the offset of each string in it.
+    """
+
+    def __init__(self, offsets, text):
+        self.offsets = offsets
+        self.text = text
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.text[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class SortedIndex(Mapping):
+    """
+    Read-only mapping from the strings of a StringTable to their
+    positions, found by binary search over the positions in string order.
+    """
+
+    def __init__(self, strings, order):
+        self.strings = strings
+        self.order = order
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            i = bisect.bisect_left(self.order, key,
+                                   key=self.strings.__getitem__)
+            if i < len(self.order) and self.strings[self.order[i]] == key:
+                return self.order[i]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.strings)
+
+    def __len__(self):
+        return len(self.strings)
+
+
+class Records(Mapping):
+    """
+    Read-only mapping from IDs to dictionaries of fields, as in the people
+    and movies dictionaries of degrees.py, with each field kept in a
+    StringTable by position.
+    """
+
+    def __init__(self, index, fields):
+        self.index = index
+        self.fields = fields
+
+    def __getitem__(self, key):
+        i = self.index[key]
+        return {field: strings[i] for field, strings in self.fields.items()}
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+
+class NameTable(Mapping):
+    """
+    Read-only mapping from lowercase names to the set of person_ids with
+    that name, as in the names dictionary of degrees.py. The people named
+    keys[i] are the positions person_indices[offsets[i]:offsets[i + 1]]
+    in person_ids.
+    """
+
+    def __init__(self, keys, offsets, person_indices, person_ids):
+        self.keys = keys
+        self.offsets = offsets
+        self.person_indices = person_indices
+        self.person_ids = person_ids
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            i = bisect.bisect_left(self.keys, key)
+            if i < len(self.keys) and self.keys[i] == key:
+                return {
+                    self.person_ids[p] for p in
+                    self.person_indices[self.offsets[i]:self.offsets[i + 1]]
+                }
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+
+def fingerprint(directory):
+    """
+    Returns the mtime and size of each CSV file in directory.
+    """
+    result = {}
+    for filename in SOURCES:
+        stat = os.stat(os.path.join(directory, filename))
+        result[filename] = [stat.st_mtime_ns, stat.st_size]
+    return result
+
+
+def string_table(strings):
+    """
+    Returns (offsets, text) arrays for a StringTable of strings.
+    """
+    offsets = array("q", [0])
+    text = bytearray()
+    for string in strings:
+        text += string.encode("utf-8")
+        offsets.append(len(text))
+    return offsets, array("B", text)
+
+
+def save_snapshot(directory, graph, people, movies, names, files):
+    """
+    Writes a snapshot of a loaded dataset into directory. files is the
+    fingerprint of the CSV files taken before they were read, so that
+    any change made while they were being read leaves the snapshot out
+    of date.
+    """
+    person_ids = list(graph.person_ids)
+    movie_ids = list(graph.movie_ids)
+    keys = sorted(names)
+    tables = {
+        "person_ids": person_ids,
+        "movie_ids": movie_ids,
+        "name_keys": keys
+    }
+    for field in PERSON_FIELDS:
+        tables[f"person_{field}"] = [people[i][field] for i in person_ids]
+    for field in MOVIE_FIELDS:
+        tables[f"movie_{field}"] = [movies[i][field] for i in movie_ids]
+
+    arrays = {name: getattr(graph, name) for name in ARRAYS}
+    for name, strings in tables.items():
+        arrays[f"{name}_offsets"], arrays[f"{name}_text"] = string_table(strings)
+    arrays["person_order"] = array("i", sorted(range(len(person_ids)),
+                                               key=person_ids.__getitem__))
+    arrays["movie_order"] = array("i", sorted(range(len(movie_ids)),
+                                              key=movie_ids.__getitem__))
+    name_offsets = array("q", [0])
+    name_people = array("i")
+    for key in keys:
+        name_people.extend(sorted(graph.person_index[person_id]
+                                  for person_id in names[key]))
+        name_offsets.append(len(name_people))
+    arrays["name_offsets"] = name_offsets
+    arrays["name_people"] = name_people
+
+    # Lay out each array on an 8-byte boundary after the header
+    sections = {}
+    offset = 0
+    for name, values in arrays.items():
+        sections[name] = [offset, len(values), values.typecode]
+        offset += align(len(values) * values.itemsize)
+
+    header = json.dumps({
+        "fingerprint": files,
+        "sections": sections
+    }).encode("utf-8")
+    base = align(len(MAGIC) + 8 + len(header))
+
+    path = os.path.join(directory, FILENAME)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for name, values in arrays.items():
+            f.write(bytes(base + sections[name][0] - f.tell()))
+            f.write(values.tobytes())
+    os.replace(temporary, path)
+
+
+def load_snapshot(directory):
+    """
+    Returns (graph, people, movies, names) from the snapshot in directory,
+    or None if there is no snapshot or it is out of date or malformed.
+    The people, movies and names mappings are read-only views of the
+    snapshot.
+    """
+    path = os.path.join(directory, FILENAME)
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            length = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(length))
+            if header["fingerprint"] != fingerprint(directory):
+                return None
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        base = align(len(MAGIC) + 8 + length)
+        view = memoryview(data)
+        arrays = {}
+        for name, (offset, count, typecode) in header["sections"].items():
+            start = base + offset
+            end = start + count * array(typecode).itemsize
+            if end > len(view):
+                return None
+            arrays[name] = view[start:end].cast(typecode)
+
+        tables = {}
+        for name in ("person_ids", "movie_ids", "name_keys",
+                     *(f"person_{field}" for field in PERSON_FIELDS),
+                     *(f"movie_{field}" for field in MOVIE_FIELDS)):
+            tables[name] = StringTable(arrays[f"{name}_offsets"],
+                                       arrays[f"{name}_text"])
+        person_index = SortedIndex(tables["person_ids"],
+                                   arrays["person_order"])
+        movie_index = SortedIndex(tables["movie_ids"], arrays["movie_order"])
+        graph = Graph(tables["person_ids"], tables["movie_ids"],
+                      *(arrays[name] for name in ARRAYS),
+                      person_index=person_index, movie_index=movie_index)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+    people = Records(person_index, {
+        field: tables[f"person_{field}"] for field in PERSON_FIELDS
+    })
+    movies = Records(movie_index, {
+        field: tables[f"movie_{field}"] for field in MOVIE_FIELDS
+    })
+    names = NameTable(tables["name_keys"], arrays["name_offsets"],
+                      arrays["name_people"], tables["person_ids"])
+    return graph, people, movies, names
+
+
+def align(size):
+    """
+    Rounds size up to a multiple of 8 bytes.
+    """
+    return (size + 7) & ~7
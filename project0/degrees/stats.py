@@ -0,0 +1,217 @@
+"""
+Sampled degrees-of-separation statistics over a whole dataset.
+
+Connected components and the distributions of movies per person and
+stars per movie are computed exactly. Separation statistics are
+estimated by running complete breadth-first searches from randomly
+sampled people in forked worker processes, which share the loaded graph
+copy-on-write. Running estimates are printed as results arrive.
+
+The mean separation is estimated from the mean distance to everyone
+reachable from each sampled person. Its confidence interval treats
+those per-person means as independent samples, since the distances
+within a single search are strongly correlated.
+
+Usage: python stats.py [directory] [--samples N] [--workers N] [--seed N]
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import random
+from collections import Counter
+
+import degrees
+
+
+def layer_sizes(graph, source):
+    """
+    Returns the number of people at each distance from source, starting
+    with source itself at distance 0.
+    """
+    reached = bytearray(len(graph.person_ids))
+    reached[source] = 1
+    movies_seen = bytearray(len(graph.movie_ids))
+    sizes = [1]
+    layer = [source]
+    while layer:
+        next_layer = []
+        for p in layer:
+            for m in graph.movies_of(p):
+                if movies_seen[m]:
+                    continue
+                movies_seen[m] = 1
+                for q in graph.stars_of(m):
+                    if not reached[q]:
+                        reached[q] = 1
+                        next_layer.append(q)
+        if next_layer:
+            sizes.append(len(next_layer))
+        layer = next_layer
+    return sizes
+
+
+def sample(source):
+    """
+    Searches from one sampled person in a worker process.
+    """
+    return layer_sizes(degrees.graph, source)
+
+
+def components(graph):
+    """
+    Returns a Counter mapping component sizes to how many components of
+    that size the graph has.
+    """
+    reached = bytearray(len(graph.person_ids))
+    movies_seen = bytearray(len(graph.movie_ids))
+    sizes = Counter()
+    for p in range(len(graph.person_ids)):
+        if reached[p]:
+            continue
+        reached[p] = 1
+        size = 0
+        stack = [p]
+        while stack:
+            q = stack.pop()
+            size += 1
+            for m in graph.movies_of(q):
+                if movies_seen[m]:
+                    continue
+                movies_seen[m] = 1
+                for r in graph.stars_of(m):
+                    if not reached[r]:
+                        reached[r] = 1
+                        stack.append(r)
+        sizes[size] += 1
+    return sizes
+
+
+def power_of_two_histogram(values):
+    """
+    Returns a Counter of values bucketed by the power of two below them,
+    with 0 kept in its own bucket.
+    """
+    return Counter(1 << (v.bit_length() - 1) if v else 0 for v in values)
+
+
+class Estimate():
+    """
+    Running aggregate of the layer sizes seen from sampled people.
+    """
+
+    def __init__(self):
+        self.sources = 0
+        self.distances = Counter()
+        self.eccentricities = Counter()
+        self.means = []
+
+    def add(self, sizes):
+        self.sources += 1
+        for distance, count in enumerate(sizes):
+            if distance:
+                self.distances[distance] += count
+        self.eccentricities[len(sizes) - 1] += 1
+        reachable = sum(sizes) - 1
+        if reachable:
+            self.means.append(
+                sum(d * count for d, count in enumerate(sizes)) / reachable
+            )
+
+    def mean(self):
+        """
+        Returns the mean separation and the half-width of its 95%
+        confidence interval.
+        """
+        n = len(self.means)
+        if n == 0:
+            return math.nan, math.nan
+        mean = sum(self.means) / n
+        if n == 1:
+            return mean, math.inf
+        variance = sum((x - mean) ** 2 for x in self.means) / (n - 1)
+        return mean, 1.96 * math.sqrt(variance / n)
+
+
+def print_histogram(title, histogram, label):
+    print(title)
+    total = sum(histogram.values())
+    for key in sorted(histogram):
+        count = histogram[key]
+        print(f"  {label(key):>12}: {count:>12} ({count / total:.2%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--samples", type=int, default=1000,
+                        help="number of people to search from")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=50)
+    parser.add_argument("--progress", type=int, default=50,
+                        help="print running estimates every N samples")
+    args = parser.parse_args()
+    if args.samples < 1:
+        parser.error("--samples must be at least 1")
+    if args.progress < 1:
+        parser.error("--progress must be at least 1")
+
+    print("Loading data...")
+    degrees.load_data(args.directory)
+    graph = degrees.graph
+    print(f"Data loaded: {len(graph.person_ids)} people, "
+          f"{len(graph.movie_ids)} movies.")
+
+    print_histogram(
+        "Movies per person:",
+        power_of_two_histogram(
+            graph.degree(p) for p in range(len(graph.person_ids))
+        ),
+        lambda bucket: f">= {bucket}" if bucket else "0"
+    )
+    print_histogram(
+        "Stars per movie:",
+        power_of_two_histogram(
+            graph.movie_offsets[m + 1] - graph.movie_offsets[m]
+            for m in range(len(graph.movie_ids))
+        ),
+        lambda bucket: f">= {bucket}" if bucket else "0"
+    )
+
+    sizes = components(graph)
+    largest = max(sizes)
+    print(f"Components: {sum(sizes.values())}, largest {largest} people "
+          f"({largest / len(graph.person_ids):.2%}), "
+          f"{sizes[1]} people with no co-stars.")
+
+    # Sample from people with at least one movie
+    rng = random.Random(args.seed)
+    candidates = [
+        p for p in range(len(graph.person_ids)) if graph.degree(p) > 0
+    ]
+    sources = [rng.choice(candidates) for _ in range(args.samples)]
+
+    estimate = Estimate()
+    context = multiprocessing.get_context("fork")
+    with context.Pool(args.workers) as pool:
+        for sizes in pool.imap_unordered(sample, sources):
+            estimate.add(sizes)
+            if estimate.sources % args.progress == 0:
+                mean, error = estimate.mean()
+                print(f"{estimate.sources} samples: mean separation "
+                      f"{mean:.3f} ± {error:.3f}, max eccentricity seen "
+                      f"{max(estimate.eccentricities)}")
+
+    mean, error = estimate.mean()
+    print(f"Mean separation: {mean:.3f} ± {error:.3f} (95% CI, "
+          f"{estimate.sources} samples)")
+    print(f"Diameter is at least {max(estimate.eccentricities)}.")
+    print_histogram("Separation between sampled and reachable people:",
+                    estimate.distances, str)
+    print_histogram("Eccentricity of sampled people:",
+                    estimate.eccentricities, str)
+
+
+if __name__ == "__main__":
+    main()
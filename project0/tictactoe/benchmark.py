@@ -0,0 +1,143 @@
+"""
+Benchmark of the tictactoe search modes.
+
+A fixed set of positions, taken from seeded random games, is replayed
+against each search mode with instrumentation on. Each mode starts with
+empty caches and replays the positions twice: the cold pass includes
+building the mode's tables and the warm pass shows the cost of a move
+once they are built.
+
+Usage: python benchmark.py [--positions N] [--seed N] [--mode M ...]
+                           [--json FILE]
+"""
+
+import argparse
+import json
+import random
+
+import tictactoe as ttt
+
+
+def playable():
+    """
+    Returns the number of positions reachable from the initial state
+    with at least one mark and the game not over.
+    """
+    seen = set()
+    stack = [ttt.freeze(ttt.initial_state())]
+    while stack:
+        board = stack.pop()
+        for action in ttt.actions(board):
+            child = ttt.freeze(ttt.result(board, action))
+            if child not in seen and not ttt.terminal(child):
+                seen.add(child)
+                stack.append(child)
+    return len(seen)
+
+
+def positions(count, seed):
+    """
+    Returns count distinct positions from random games, each with at
+    least one mark and no winner yet, in a fixed order for a given seed.
+    Raises ValueError if there are fewer than count such positions.
+    """
+    available = playable()
+    if count > available:
+        raise ValueError(f"only {available} positions can be benchmarked")
+    rng = random.Random(seed)
+    found = {}
+    while len(found) < count:
+        board = ttt.initial_state()
+        while True:
+            board = ttt.result(board, rng.choice(sorted(ttt.actions(board))))
+            if ttt.terminal(board):
+                break
+            found.setdefault(ttt.freeze(board), None)
+            if len(found) == count:
+                break
+    return [[list(row) for row in board] for board in found]
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of a sorted list of values.
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def replay(boards, mode):
+    """
+    Returns a summary of the work done finding a move on each board.
+    """
+    calls = []
+    for board in boards:
+        ttt.minimax(board, mode, instrument=True)
+        calls.append(ttt.last_stats)
+    seconds = sorted(stats.seconds for stats in calls)
+    return {
+        "total_ms": sum(seconds) * 1000,
+        "p50_ms": percentile(seconds, 0.50) * 1000,
+        "p90_ms": percentile(seconds, 0.90) * 1000,
+        "max_ms": seconds[-1] * 1000,
+        "nodes": sum(stats.nodes for stats in calls),
+        "cache_hits": sum(stats.cache_hits for stats in calls),
+        "cutoffs": sum(stats.cutoffs for stats in calls),
+        "max_depth": max(stats.max_depth for stats in calls)
+    }
+
+
+def benchmark(count, seed, modes):
+    """
+    Replays the positions against each mode. Returns the results as a
+    dictionary.
+    """
+    boards = positions(count, seed)
+    results = {"positions": len(boards), "seed": seed, "modes": {}}
+    for mode in modes:
+        ttt.clear_caches()
+        results["modes"][mode] = {
+            "cold": replay(boards, mode),
+            "warm": replay(boards, mode)
+        }
+    return results
+
+
+def print_results(results):
+    """
+    Prints benchmark results as a table.
+    """
+    print(f"{results['positions']} positions, seed {results['seed']}")
+    print(f"{'mode':<12}{'pass':<6}{'total ms':>10}{'p50 ms':>9}"
+          f"{'p90 ms':>9}{'max ms':>9}{'nodes':>9}{'hits':>9}"
+          f"{'cutoffs':>9}{'depth':>7}")
+    for mode, passes in results["modes"].items():
+        for name, row in passes.items():
+            print(f"{mode:<12}{name:<6}{row['total_ms']:>10.2f}"
+                  f"{row['p50_ms']:>9.3f}{row['p90_ms']:>9.3f}"
+                  f"{row['max_ms']:>9.3f}{row['nodes']:>9}"
+                  f"{row['cache_hits']:>9}{row['cutoffs']:>9}"
+                  f"{row['max_depth']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--positions", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=50)
+    parser.add_argument("--mode", action="append", choices=ttt.SEARCH_MODES,
+                        help="search mode to time (default: all)")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+    available = playable()
+    if not 0 < args.positions <= available:
+        parser.error(f"--positions must be between 1 and {available}")
+
+    results = benchmark(args.positions, args.seed,
+                        args.mode or list(ttt.SEARCH_MODES))
+    print_results(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
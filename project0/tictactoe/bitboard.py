@@ -0,0 +1,216 @@
+"""
+Tic Tac Toe boards as a pair of bitmasks.
+
+Cell (i, j) is bit 3 * i + j. One mask holds the cells marked X and the
+other the cells marked O, so moves are made and unmade in place with a
+single bit operation, and wins are found by testing the marks of the
+player who just moved against eight precomputed line masks.
+
+As in tictactoe.py, O moves whenever an even number of cells is marked.
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+WIN_MASKS = (
+    0b000000111,        #horizontal top
+    0b000111000,        #horizontal middle
+    0b111000000,        #horizontal bottom
+    0b001001001,        #vertical left
+    0b010010010,        #vertical middle
+    0b100100100,        #vertical right
+    0b100010001,        #diagonal \
+    0b001010100,        #diagonal /
+)
+
+# Moves as (i, j) actions, indexed by bit position
+ACTIONS = tuple((cell // 3, cell % 3) for cell in range(9))
+
+
+def bit(action):
+    """
+    Returns the bit for move (i, j).
+    """
+    return 1 << (3 * action[0] + action[1])
+
+
+def has_line(marks):
+    """
+    Returns True if marks cover any of the win masks.
+    """
+    for mask in WIN_MASKS:
+        if marks & mask == mask:
+            return True
+    return False
+
+
+class BitBoard():
+    """
+    Mutable board holding the X and O marks as bitmasks.
+    """
+
+    def __init__(self, x=0, o=0):
+        self.x = x
+        self.o = o
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Returns the BitBoard for a list of lists board.
+        """
+        x = o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= 1 << (3 * i + j)
+                elif cell == O:
+                    o |= 1 << (3 * i + j)
+        return cls(x, o)
+
+    def to_board(self):
+        """
+        Returns the list of lists board used by tictactoe.py and runner.py.
+        """
+        board = [[EMPTY, EMPTY, EMPTY] for _ in range(3)]
+        for cell in range(9):
+            if self.x >> cell & 1:
+                board[cell // 3][cell % 3] = X
+            elif self.o >> cell & 1:
+                board[cell // 3][cell % 3] = O
+        return board
+
+    def key(self):
+        return (self.x, self.o)
+
+    def copy(self):
+        return BitBoard(self.x, self.o)
+
+    def empty(self):
+        """
+        Returns the mask of unmarked cells.
+        """
+        return FULL & ~(self.x | self.o)
+
+    def player(self):
+        """
+        Returns player who has the next turn.
+        """
+        return O if (self.x | self.o).bit_count() % 2 == 0 else X
+
+    def actions(self):
+        """
+        Returns the list of available moves (i, j).
+        """
+        empty = self.empty()
+        return [ACTIONS[cell] for cell in range(9) if empty >> cell & 1]
+
+    def winner(self):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        if has_line(self.x):
+            return X
+        elif has_line(self.o):
+            return O
+        return None
+
+    def terminal(self):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return (self.x | self.o) == FULL or has_line(self.x) or has_line(self.o)
+
+    def utility(self):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        if has_line(self.x):
+            return 1
+        elif has_line(self.o):
+            return -1
+        return 0
+
+    def move(self, action):
+        """
+        Marks move (i, j) for the current player, in place.
+        Raises ValueError if the cell is already marked.
+        """
+        b = bit(action)
+        if (self.x | self.o) & b:
+            raise ValueError(f"not available move: {action}")
+        if (self.x | self.o).bit_count() % 2 == 0:
+            self.o |= b
+        else:
+            self.x |= b
+
+    def unmove(self, action):
+        """
+        Clears the mark at (i, j), undoing move(action).
+        """
+        b = ~bit(action)
+        self.x &= b
+        self.o &= b
+
+
+# Maps (x, o) masks to (value, best move) for boards already solved
+solved = {}
+
+# Object recording the work done by solve, set by instrumented callers
+stats = None
+
+
+def solve(x, o):
+    """
+    Returns (value, best move) under perfect play for the board with X
+    marks x and O marks o. Values are as for utility, and the best move
+    is None on a finished board.
+    """
+    if stats is not None:
+        stats.visit((x | o).bit_count())
+    key = (x, o)
+    if key in solved:
+        if stats is not None:
+            stats.cache_hits += 1
+        return solved[key]
+
+    marks = x | o
+    if has_line(x):
+        answer = (1, None)
+    elif has_line(o):
+        answer = (-1, None)
+    elif marks == FULL:
+        answer = (0, None)
+    else:
+        maximizing = marks.bit_count() % 2 == 1
+        best = None
+        best_move = None
+        empty = FULL & ~marks
+        for cell in range(9):
+            b = 1 << cell
+            if not empty & b:
+                continue
+            if maximizing:
+                value = solve(x | b, o)[0]
+                better = best is None or value > best
+            else:
+                value = solve(x, o | b)[0]
+                better = best is None or value < best
+            if better:
+                best = value
+                best_move = ACTIONS[cell]
+        answer = (best, best_move)
+
+    solved[key] = answer
+    return answer
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on a list of lists
+    board, or None if the game is over.
+    """
+    bitboard = BitBoard.from_board(board)
+    return solve(bitboard.x, bitboard.o)[1]
@@ -0,0 +1,303 @@
+"""
+m,n,k-game Player
+
+Generalizes tictactoe.py to boards of m rows and n columns won by k
+marks in a row, with the same functions so that runner.py can drive
+either module. Boards are too large to search completely, so minimax
+runs an iterative deepening alpha-beta search until its time budget
+runs out, scoring unfinished positions by their open lines.
+
+As in tictactoe.py, O moves whenever an even number of cells is marked.
+"""
+
+import math
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Default seconds minimax may spend choosing a move
+TIME_BUDGET = 1.0
+
+# Score of a won position, less one per move it takes to reach it. Set
+# by configure above any open line score the board can add up to
+WIN = None
+
+# Information about the last minimax search
+search_info = {"depth": 0, "nodes": 0, "value": 0, "seconds": 0.0}
+
+
+def configure(m, n, k):
+    """
+    Sets the board to m rows and n columns, won by k marks in a row.
+    """
+    global M, N, K, WIN, windows, windows_through, line_weights, cell_order
+    if m < 1 or n < 1 or not 1 <= k <= max(m, n):
+        raise ValueError(f"no {k} in a row on a {m}x{n} board")
+    M, N, K = m, n, k
+
+    # Every run of k cells in a row, column or diagonal, as flat indices
+    windows = []
+    for i in range(m):
+        for j in range(n):
+            for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_i = i + di * (k - 1)
+                end_j = j + dj * (k - 1)
+                if 0 <= end_i < m and 0 <= end_j < n:
+                    windows.append(tuple(
+                        (i + di * step) * n + j + dj * step
+                        for step in range(k)
+                    ))
+    windows_through = [[] for _ in range(m * n)]
+    for w, window in enumerate(windows):
+        for cell in window:
+            windows_through[cell].append(w)
+
+    # An open line with c marks scores 4 ** c, so lines nearer to
+    # completion outweigh many shorter ones. Even a win at the deepest
+    # ply must outscore every window holding k - 1 marks
+    WIN = len(windows) * 4 ** (k - 1) + m * n + 1
+    line_weights = [0] + [4 ** c for c in range(1, k)] + [WIN]
+
+    # Search moves nearer the center first
+    cell_order = sorted(
+        range(m * n),
+        key=lambda cell: abs(cell // n - (m - 1) / 2)
+        + abs(cell % n - (n - 1) / 2)
+    )
+
+
+configure(3, 3, 3)
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return [[EMPTY] * N for _ in range(M)]
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    marked = sum(cell != EMPTY for row in board for cell in row)
+    return O if marked % 2 == 0 else X
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {
+        (i, j)
+        for i, row in enumerate(board)
+        for j, cell in enumerate(row)
+        if cell == EMPTY
+    }
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    Raises ValueError if the move is not available.
+    """
+    i, j = action
+    if not (0 <= i < M and 0 <= j < N) or board[i][j] != EMPTY:
+        raise ValueError(f"not available move: {action}")
+    result_board = [list(row) for row in board]
+    result_board[i][j] = player(board)
+    return result_board
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    cells = [cell for row in board for cell in row]
+    for window in windows:
+        first = cells[window[0]]
+        if first != EMPTY and all(cells[c] == first for c in window):
+            return first
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return winner(board) is not None or all(
+        cell != EMPTY for row in board for cell in row
+    )
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    w = winner(board)
+    if w == X:
+        return 1
+    elif w == O:
+        return -1
+    return 0
+
+
+class Timeout(Exception):
+    """
+    Raised inside a search when its deadline passes or it is cancelled.
+    """
+
+
+class Search():
+    """
+    Alpha-beta search over a flat copy of a board, keeping the number of
+    X and O marks in every window and the open line score up to date as
+    moves are made and unmade.
+    """
+
+    def __init__(self, board, deadline, cancel):
+        self.cells = [cell for row in board for cell in row]
+        self.deadline = deadline
+        self.cancel = cancel
+        self.nodes = 0
+        self.x_counts = [0] * len(windows)
+        self.o_counts = [0] * len(windows)
+        for w, window in enumerate(windows):
+            for cell in window:
+                if self.cells[cell] == X:
+                    self.x_counts[w] += 1
+                elif self.cells[cell] == O:
+                    self.o_counts[w] += 1
+        self.score = sum(
+            self.line_score(w) for w in range(len(windows))
+        )
+        self.empty = self.cells.count(EMPTY)
+
+    def line_score(self, w):
+        """
+        Returns the open line score of window w, positive for X.
+        """
+        x, o = self.x_counts[w], self.o_counts[w]
+        if o == 0:
+            return line_weights[x]
+        elif x == 0:
+            return -line_weights[o]
+        return 0
+
+    def make(self, cell, mark):
+        """
+        Marks cell and returns True if that completes a line.
+        """
+        self.cells[cell] = mark
+        self.empty -= 1
+        counts = self.x_counts if mark == X else self.o_counts
+        won = False
+        for w in windows_through[cell]:
+            self.score -= self.line_score(w)
+            counts[w] += 1
+            self.score += self.line_score(w)
+            if counts[w] == K:
+                won = True
+        return won
+
+    def unmake(self, cell, mark):
+        self.cells[cell] = EMPTY
+        self.empty += 1
+        counts = self.x_counts if mark == X else self.o_counts
+        for w in windows_through[cell]:
+            self.score -= self.line_score(w)
+            counts[w] -= 1
+            self.score += self.line_score(w)
+
+    def check_time(self):
+        if time.monotonic() > self.deadline or (
+            self.cancel is not None and self.cancel.is_set()
+        ):
+            raise Timeout
+
+    def negamax(self, depth, alpha, beta, mark, ply):
+        """
+        Returns the value of the position for mark, the player to move,
+        searching depth more moves.
+        """
+        self.nodes += 1
+        if self.nodes % 1024 == 0:
+            self.check_time()
+        if depth == 0 or self.empty == 0:
+            return self.score if mark == X else -self.score
+
+        other = O if mark == X else X
+        value = -math.inf
+        for cell in cell_order:
+            if self.cells[cell] != EMPTY:
+                continue
+            if self.make(cell, mark):
+                child = WIN - ply
+            else:
+                child = -self.negamax(depth - 1, -beta, -alpha, other, ply + 1)
+            self.unmake(cell, mark)
+            value = max(value, child)
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+        return value
+
+    def root(self, depth, mark, first):
+        """
+        Returns (value, best cell) for mark searching depth moves,
+        trying first before the other moves.
+        """
+        other = O if mark == X else X
+        alpha = -math.inf
+        best = None
+        order = cell_order
+        if first is not None:
+            order = [first] + [cell for cell in cell_order if cell != first]
+        for cell in order:
+            if self.cells[cell] != EMPTY:
+                continue
+            if self.make(cell, mark):
+                value = WIN
+            else:
+                value = -self.negamax(depth - 1, -math.inf, -alpha, other, 1)
+            self.unmake(cell, mark)
+            if value > alpha:
+                alpha = value
+                best = cell
+        return alpha, best
+
+
+def minimax(board, budget=None, cancel=None):
+    """
+    Returns the best action found for the current player on the board
+    within budget seconds, or None if the game is over.
+
+    If cancel is given, the search stops as soon as cancel.is_set() is
+    true and returns the best action found so far.
+    """
+    if terminal(board):
+        return None
+    start = time.monotonic()
+    deadline = start + (TIME_BUDGET if budget is None else budget)
+    search = Search(board, deadline, cancel)
+    mark = player(board)
+
+    best = None
+    depth = 0
+    value = 0
+    try:
+        while depth < search.empty:
+            value, best = search.root(depth + 1, mark, best)
+            depth += 1
+            if abs(value) >= WIN - M * N:
+                break
+    except Timeout:
+        pass
+    if best is None:
+        best = next(c for c in cell_order if search.cells[c] == EMPTY)
+
+    search_info.update(depth=depth, nodes=search.nodes, value=value,
+                       seconds=time.monotonic() - start)
+    return (best // N, best % N)
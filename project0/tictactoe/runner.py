@@ -1,9 +1,62 @@
+import argparse
 import pygame
 import sys
+import threading
 import time
+import traceback
 
 import tictactoe as ttt
 
+parser = argparse.ArgumentParser(description="Play Tic-Tac-Toe.")
+parser.add_argument("size", nargs="*", type=int, metavar="m n k",
+                    help="play k in a row on an m by n board")
+parser.add_argument("--think", type=float, default=1.0,
+                    help="seconds the computer may think on large boards")
+args = parser.parse_args()
+if len(args.size) == 3:
+    import mnk as ttt
+    ttt.configure(*args.size)
+elif args.size:
+    parser.error("give all of m, n and k")
+
+# Shortest time the computer takes to move, so its moves can be followed
+MOVE_DELAY = 0.5
+
+
+def choose_move(board, cancel):
+    """
+    Returns the computer's move, stopping early once cancel is set.
+    """
+    if ttt.__name__ == "mnk":
+        return ttt.minimax(board, args.think, cancel)
+    return ttt.minimax(board)
+
+
+class MoveWorker():
+    """
+    Computes one computer move in a background thread, so that the
+    window keeps responding while it thinks.
+    """
+
+    def __init__(self, board):
+        self.cancel = threading.Event()
+        self.move = None
+        self.started = time.monotonic()
+        self.thread = threading.Thread(target=self.run, args=(board,),
+                                       daemon=True)
+        self.thread.start()
+
+    def run(self, board):
+        try:
+            self.move = choose_move(board, self.cancel)
+        except Exception:
+            traceback.print_exc()
+
+    def done(self):
+        return (not self.thread.is_alive()
+                and time.monotonic() - self.started >= MOVE_DELAY)
+
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -15,11 +68,19 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+worker = None
+
+# Set when the computer fails to find a move, ending the game
+failed = False
+clock = pygame.time.Clock()
+
+# Fit the board between the title and the bottom button
+rows, cols = len(board), len(board[0])
+tile_size = min(80, (height - 140) // rows, (width - 40) // cols)
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
 
 while True:
 
@@ -27,6 +88,15 @@ while True:
         if event.type == pygame.QUIT:
             sys.exit()
 
+        # Escape abandons the game, stopping any move being computed
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            if worker is not None:
+                worker.cancel.set()
+                worker = None
+            user = None
+            board = ttt.initial_state()
+            failed = False
+
     screen.fill(black)
 
     # Let user choose a player.
@@ -67,13 +137,12 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (cols / 2 * tile_size),
+                       height / 2 - (rows / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(rows):
             row = []
-            for j in range(3):
+            for j in range(cols):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -89,11 +158,13 @@ while True:
                 row.append(rect)
             tiles.append(row)
 
-        game_over = ttt.terminal(board)
+        game_over = ttt.terminal(board) or failed
         player = ttt.player(board)
 
         # Show title
-        if game_over:
+        if failed:
+            title = f"Computer could not move."
+        elif game_over:
             winner = ttt.winner(board)
             if winner is None:
                 title = f"Game Over: Tie."
@@ -110,20 +181,21 @@ while True:
 
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if worker is None:
+                worker = MoveWorker(board)
+            elif worker.done():
+                if worker.move is None:
+                    failed = True
+                else:
+                    board = ttt.result(board, worker.move)
+                worker = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(rows):
+                for j in range(cols):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
@@ -139,8 +211,12 @@ while True:
                 mouse = pygame.mouse.get_pos()
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
+                    if worker is not None:
+                        worker.cancel.set()
+                        worker = None
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    failed = False
 
     pygame.display.flip()
+    clock.tick(60)
@@ -0,0 +1,103 @@
+"""
+Symmetries of square Tic Tac Toe boards.
+
+A square board looks the same to both players under each of the eight
+rotations and reflections of the square, so searches and tables only
+need one of every eight equivalent boards. The canonical form of a board
+is the transform of it with the lowest base 3 index, reading cells in
+row order with EMPTY as 0, X as 1 and O as 2.
+
+A move (i, j) on a board is transform_move((i, j), t, n) on its
+transform t, and a move on the canonical board is mapped back with the
+inverse transform, INVERSE[t].
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+CODES = {EMPTY: 0, X: 1, O: 2}
+
+# Where each transform sends cell (i, j) of an n by n board
+TRANSFORMS = (
+    lambda i, j, n: (i, j),                     #identity
+    lambda i, j, n: (j, n - 1 - i),             #rotate 90 clockwise
+    lambda i, j, n: (n - 1 - i, n - 1 - j),     #rotate 180
+    lambda i, j, n: (n - 1 - j, i),             #rotate 270 clockwise
+    lambda i, j, n: (i, n - 1 - j),             #mirror left to right
+    lambda i, j, n: (n - 1 - i, j),             #mirror top to bottom
+    lambda i, j, n: (j, i),                     #transpose \
+    lambda i, j, n: (n - 1 - j, n - 1 - i),     #transpose /
+)
+
+# Index of the transform undoing each transform
+INVERSE = (0, 3, 2, 1, 4, 5, 6, 7)
+
+# Maps board sizes to, for each transform, the cell of the original
+# board that lands on each cell of the transformed board
+sources = {}
+
+
+def cell_sources(n):
+    """
+    Returns the source cells of every transform for an n by n board.
+    """
+    if n not in sources:
+        sources[n] = []
+        for transform in TRANSFORMS:
+            source = [0] * (n * n)
+            for i in range(n):
+                for j in range(n):
+                    ti, tj = transform(i, j, n)
+                    source[ti * n + tj] = i * n + j
+            sources[n].append(tuple(source))
+    return sources[n]
+
+
+def board_index(board):
+    """
+    Returns the base 3 index of a board, reading its cells in row order.
+    """
+    index = 0
+    for row in board:
+        for cell in row:
+            index = index * 3 + CODES[cell]
+    return index
+
+
+def canonical(board):
+    """
+    Returns (index, t) where index is the lowest index of any transform
+    of the square board and t is the transform giving it.
+    """
+    codes = [CODES[cell] for row in board for cell in row]
+    best = None
+    best_t = 0
+    for t, source in enumerate(cell_sources(len(board))):
+        index = 0
+        for cell in source:
+            index = index * 3 + codes[cell]
+        if best is None or index < best:
+            best = index
+            best_t = t
+    return best, best_t
+
+
+def transform_move(action, t, n=3):
+    """
+    Returns where move (i, j) lands under transform t.
+    """
+    return TRANSFORMS[t](action[0], action[1], n)
+
+
+def transform_board(board, t):
+    """
+    Returns a new board holding transform t of the square board.
+    """
+    n = len(board)
+    transformed = [[EMPTY] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(n):
+            ti, tj = TRANSFORMS[t](i, j, n)
+            transformed[ti][tj] = board[i][j]
+    return transformed
@@ -0,0 +1,72 @@
+"""
+Builds the perfect-play table loaded by tictactoe.minimax.
+
+Every position reachable from the empty board is solved once with the
+bitboard engine, and one board of each set of symmetric boards is kept.
+The table lists the sorted canonical indices of those boards as
+little-endian 16 bit integers, then one byte per board: the high four
+bits hold the value plus one and the low four bits the cell 3 * i + j of
+the best move on the canonical board, or NO_MOVE on a finished board.
+
+Usage: python tablegen.py [output]
+"""
+
+import sys
+from array import array
+
+import bitboard
+import tictactoe as ttt
+from symmetry import canonical, transform_move
+
+
+def reachable(board, seen):
+    """
+    Adds the keys of all BitBoards reachable from board to seen.
+    """
+    seen.add(board.key())
+    if board.terminal():
+        return
+    for action in board.actions():
+        board.move(action)
+        if board.key() not in seen:
+            reachable(board, seen)
+        board.unmove(action)
+
+
+def build_table():
+    """
+    Returns the perfect-play table as bytes and the number of boards in it.
+    """
+    seen = set()
+    reachable(bitboard.BitBoard(), seen)
+    entries = {}
+    for x, o in seen:
+        index, t = canonical(bitboard.BitBoard(x, o).to_board())
+        if index in entries:
+            continue
+        value, move = bitboard.solve(x, o)
+        if move is None:
+            cell = ttt.NO_MOVE
+        else:
+            i, j = transform_move(move, t)
+            cell = 3 * i + j
+        entries[index] = (value + 1) << 4 | cell
+
+    order = sorted(entries)
+    indices = array("H", order)
+    if sys.byteorder == "big":
+        indices.byteswap()
+    table = indices.tobytes() + bytes(entries[index] for index in order)
+    return table, len(entries)
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else ttt.TABLE_FILE
+    table, positions = build_table()
+    with open(path, "wb") as f:
+        f.write(table)
+    print(f"Wrote {positions} positions to {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,15 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
+import os
 import random
+import sys
+import time
+from array import array
+from bisect import bisect_left
+
+import bitboard
+from symmetry import INVERSE, canonical, transform_move
 
 X = "X"
 O = "O"
@@ -62,15 +69,52 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    result_board = copy.deepcopy(board)
-    if action in actions(board):
-        result_board[action[0]][action[1]] = player(result_board)
-    else:
+    i, j = action
+    if not (0 <= i < 3 and 0 <= j < 3) or board[i][j] != EMPTY:
         print('not available move')
+        return copy_board(board)
+
+    if isinstance(board, tuple):                    #immutable board
+        row = board[i]
+        row = row[:j] + (player(board),) + row[j + 1:]
+        return board[:i] + (row,) + board[i + 1:]
 
+    result_board = [list(row) for row in board]
+    result_board[i][j] = player(board)
     return result_board
 
 
+def copy_board(board):
+    """
+    Returns a copy of a board of the same kind, list or tuple.
+    """
+    if isinstance(board, tuple):
+        return board
+    return [list(row) for row in board]
+
+
+def freeze(board):
+    """
+    Returns an immutable tuple of tuples copy of a board.
+    """
+    return tuple(tuple(row) for row in board)
+
+
+def apply_move(board, action):
+    """
+    Makes move (i, j) for the current player in place on a list board,
+    without checking that it is available.
+    """
+    board[action[0]][action[1]] = player(board)
+
+
+def undo_move(board, action):
+    """
+    Clears cell (i, j) in place, undoing apply_move.
+    """
+    board[action[0]][action[1]] = EMPTY
+
+
 def winner(board):
     """
     Returns the winner of the game, if there is one.
@@ -128,9 +172,164 @@ def utility(board):
    
     raise NotImplementedError
 
-def minimax(board):
+# Maps the canonical indices of boards already searched to their (value,
+# best move on the canonical board), kept across calls so later moves in
+# a game are looked up, not searched
+transposition_table = {}
+
+# Search modes accepted by minimax
+SEARCH_MODES = ("table", "minimax", "alphabeta", "bitboard")
+
+# Perfect-play table written by tablegen.py, loaded on first use
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "tictactoe.table")
+NO_MOVE = 0xF
+perfect_play = None
+
+# Kinds of value stored in the alpha-beta table
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Maps canonical indices to (value, kind, best move on the canonical
+# board) from alpha-beta searches, where kind says whether value is
+# exact or only a bound
+bound_table = {}
+
+# Moves that caused a cutoff, by number of marks on the board
+killer_moves = [set() for _ in range(10)]
+
+CENTER = (1, 1)
+CORNERS = {(0, 0), (0, 2), (2, 0), (2, 2)}
+
+# SearchStats recording the current minimax call, if it is instrumented
+stats = None
+
+# SearchStats of the last instrumented minimax call
+last_stats = None
+
+
+class SearchStats():
+    """
+    Work done by one instrumented minimax call.
+    """
+
+    def __init__(self, mode, board):
+        self.mode = mode
+        self.marks = count_marks(board)
+        self.nodes = 0
+        self.cache_hits = 0
+        self.cutoffs = 0
+        self.max_depth = 0
+        self.seconds = 0.0
+
+    def visit(self, marks):
+        """
+        Counts a node expanded on a board with the given number of marks.
+        """
+        self.nodes += 1
+        self.max_depth = max(self.max_depth, marks - self.marks)
+
+    def as_dict(self):
+        return {
+            "mode": self.mode,
+            "nodes": self.nodes,
+            "cache_hits": self.cache_hits,
+            "cutoffs": self.cutoffs,
+            "max_depth": self.max_depth,
+            "seconds": self.seconds
+        }
+
+
+def count_marks(board):
+    return sum(cell != EMPTY for row in board for cell in row)
+
+
+def clear_caches():
+    """
+    Forgets all search results and the loaded perfect-play table.
+    """
+    global perfect_play
+    transposition_table.clear()
+    bound_table.clear()
+    for killers in killer_moves:
+        killers.clear()
+    bitboard.solved.clear()
+    perfect_play = None
+
+
+def load_table():
+    """
+    Returns the perfect-play table as (indices, entries), reading it on
+    the first call. The table holds the sorted canonical indices of all
+    reachable boards as little-endian 16 bit integers, followed by one
+    entry byte per board.
+    """
+    global perfect_play
+    if perfect_play is None:
+        with open(TABLE_FILE, "rb") as f:
+            data = f.read()
+        count = len(data) // 3
+        indices = array("H")
+        indices.frombytes(data[:2 * count])
+        if sys.byteorder == "big":
+            indices.byteswap()
+        perfect_play = (indices, data[2 * count:])
+    return perfect_play
+
+
+def table_lookup(board):
+    """
+    Returns (value, best move) for a board from the perfect-play table.
+    Raises ValueError if the board cannot be reached in a game.
+    """
+    indices, entries = load_table()
+    index, t = canonical(board)
+    position = bisect_left(indices, index)
+    if position == len(indices) or indices[position] != index:
+        raise ValueError("board not reachable in play")
+    if stats is not None:
+        stats.visit(count_marks(board))
+        stats.cache_hits += 1
+    entry = entries[position]
+    cell = entry & 0xF
+    move = None
+    if cell != NO_MOVE:
+        move = transform_move((cell // 3, cell % 3), INVERSE[t])
+    return (entry >> 4) - 1, move
+
+
+def minimax(board, mode=None, instrument=False):
     """
     Returns the optimal action for the current player on the board.
+
+    By default the move is looked up in the perfect-play table, falling
+    back to the bitboard search for boards that cannot be reached in a
+    game. An explicit mode is one of SEARCH_MODES, and mode "table"
+    raises ValueError for such boards.
+
+    If instrument is True, the work done is recorded in last_stats.
+    """
+    if not instrument:
+        return search(board, mode)
+
+    global stats, last_stats
+    stats = SearchStats(mode, board)
+    start = time.perf_counter()
+    bitboard.stats = stats
+    try:
+        move = search(board, mode)
+    finally:
+        stats.seconds = time.perf_counter() - start
+        last_stats = stats
+        stats = bitboard.stats = None
+    return move
+
+
+def search(board, mode):
+    """
+    Returns the optimal action for the current player on the board,
+    found using the given search mode.
     """
     if terminal(board) == True:                     #game over
         return None
@@ -140,36 +339,166 @@ def minimax(board):
         j = random.randint(0,2)
         return (i,j)
 
-    elif player(board) == X:                        #AI plays as X
-        util = -math.inf
-        for action in actions(board):
-            value = min_val(result(board, action))
-            if value > util:
-                util = value
-                best_move = action
-    else:                                           #AI plays as O
-        util = math.inf
-        for action in actions(board):
-            value = max_val(result(board, action))
-            if value < util:
-                util = value
-                best_move = action
-    return best_move
+    if mode is None or mode == "table":
+        try:
+            return table_lookup(board)[1]
+        except ValueError:
+            if mode == "table":
+                raise
+        return bitboard.minimax(board)
+    elif mode == "bitboard":
+        return bitboard.minimax(board)
+
+    board = [list(row) for row in board]            #searches move in place
+    key, t = canonical(board)
+    if mode == "alphabeta":
+        alphabeta(board, -math.inf, math.inf)
+        move = bound_table[key][2]
+    elif mode == "minimax":
+        if key not in transposition_table:
+            if player(board) == X:                  #AI plays as X
+                max_val(board)
+            else:                                   #AI plays as O
+                min_val(board)
+        elif stats is not None:
+            stats.visit(count_marks(board))
+            stats.cache_hits += 1
+        move = transposition_table[key][1]
+    else:
+        raise ValueError(f"unknown search mode: {mode}")
+    return transform_move(move, INVERSE[t])
+
+
+def ordered_actions(board, first=None):
+    """
+    Returns the actions on a board in search order: first, if given,
+    then the center, the corners, killer moves and the remaining edges.
+    """
+    killers = killer_moves[9 - len(actions(board))]
+
+    def rank(action):
+        if action == first:
+            return 0
+        elif action == CENTER:
+            return 1
+        elif action in CORNERS:
+            return 2
+        elif action in killers:
+            return 3
+        return 4
+
+    return sorted(actions(board), key=rank)
+
+
+def alphabeta(board, alpha, beta):
+    """
+    Returns the minimax value of a board if it lies between alpha and
+    beta, and otherwise a bound beyond whichever of them it falls past.
+    """
+    if stats is not None:
+        stats.visit(count_marks(board))
+    key, t = canonical(board)
+    first = None
+    if key in bound_table:
+        if stats is not None:
+            stats.cache_hits += 1
+        value, kind, first = bound_table[key]
+        if first is not None:
+            first = transform_move(first, INVERSE[t])
+        if kind == EXACT:
+            return value
+        elif kind == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+
+    if terminal(board) == True:
+        value = utility(board)
+        bound_table[key] = (value, EXACT, None)
+        return value
+
+    maximizing = player(board) == X
+    window = (alpha, beta)
+    value = -math.inf if maximizing else math.inf
+    best_move = None
+    for action in ordered_actions(board, first):
+        apply_move(board, action)
+        child = alphabeta(board, alpha, beta)
+        undo_move(board, action)
+        if maximizing and child > value or not maximizing and child < value:
+            value = child
+            best_move = action
+        if maximizing:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            if stats is not None:
+                stats.cutoffs += 1
+            killer_moves[9 - len(actions(board))].add(action)
+            break
+
+    if value <= window[0]:
+        kind = UPPER
+    elif value >= window[1]:
+        kind = LOWER
+    else:
+        kind = EXACT
+    if best_move is not None:
+        best_move = transform_move(best_move, t)
+    bound_table[key] = (value, kind, best_move)
+    return value
 
 
 def max_val(board):
+    if stats is not None:
+        stats.visit(count_marks(board))
+    key, t = canonical(board)
+    if key in transposition_table:
+        if stats is not None:
+            stats.cache_hits += 1
+        return transposition_table[key][0]
+    best_move = None
     if terminal(board) == True:
-        return utility(board)    
-    value = -math.inf
-    for action in actions(board):
-        value = max(value,min_val(result(board,action)))
+        value = utility(board)
+    else:
+        value = -math.inf
+        for action in actions(board):
+            apply_move(board, action)
+            child = min_val(board)
+            undo_move(board, action)
+            if child > value:
+                value = child
+                best_move = action
+    if best_move is not None:
+        best_move = transform_move(best_move, t)
+    transposition_table[key] = (value, best_move)
     return value
 
 
 def min_val(board):
+    if stats is not None:
+        stats.visit(count_marks(board))
+    key, t = canonical(board)
+    if key in transposition_table:
+        if stats is not None:
+            stats.cache_hits += 1
+        return transposition_table[key][0]
+    best_move = None
     if terminal(board) == True:
-        return utility(board)
-    value = math.inf
-    for action in actions(board):
-        value = min(value,max_val(result(board,action)))
-    return value
\ No newline at end of file
+        value = utility(board)
+    else:
+        value = math.inf
+        for action in actions(board):
+            apply_move(board, action)
+            child = max_val(board)
+            undo_move(board, action)
+            if child < value:
+                value = child
+                best_move = action
+    if best_move is not None:
+        best_move = transform_move(best_move, t)
+    transposition_table[key] = (value, best_move)
+    return value
@@ -0,0 +1,98 @@
+"""
+Batch evaluation of many Tic Tac Toe boards with NumPy.
+
+Boards are int8 arrays of shape (N, 3, 3) or (N, 9), with cells in row
+order holding X_CODE for X, O_CODE for O and 0 for EMPTY. Each function
+returns one value per board, computed for all N boards at once. Players
+are returned as codes too, and utilities as in tictactoe.utility.
+
+As in tictactoe.py, O moves whenever an even number of cells is marked.
+"""
+
+import numpy as np
+
+X_CODE = 1
+O_CODE = -1
+
+# Flat cell indices of every row, column and diagonal
+WIN_LINES = np.array([
+    [0, 1, 2], [3, 4, 5], [6, 7, 8],            #horizontal
+    [0, 3, 6], [1, 4, 7], [2, 5, 8],            #vertical
+    [0, 4, 8], [2, 4, 6],                       #diagonal
+])
+
+
+def flatten(boards):
+    """
+    Returns boards as an (N, 9) int8 array.
+    """
+    boards = np.asarray(boards, dtype=np.int8)
+    if boards.shape[1:] not in ((3, 3), (9,)):
+        raise ValueError(f"expected (N, 3, 3) or (N, 9) boards, "
+                         f"got {boards.shape}")
+    return boards.reshape(-1, 9)
+
+
+def encode(boards):
+    """
+    Returns an (N, 9) int8 array of the list of lists boards used by
+    tictactoe.py.
+    """
+    codes = {"X": X_CODE, "O": O_CODE, None: 0}
+    return np.array(
+        [[codes[cell] for row in board for cell in row] for board in boards],
+        dtype=np.int8
+    ).reshape(-1, 9)
+
+
+def line_sums(flat):
+    """
+    Returns the (N, 8) sums of the codes along each win line.
+    """
+    return (flat[:, WIN_LINES[:, 0]] + flat[:, WIN_LINES[:, 1]]
+            + flat[:, WIN_LINES[:, 2]])
+
+
+def winners(boards):
+    """
+    Returns X_CODE, O_CODE or 0 for each board, by whether X has three in
+    a row, else O has, else neither.
+    """
+    sums = line_sums(flatten(boards))
+    x_wins = (sums == 3 * X_CODE).any(axis=1)
+    o_wins = (sums == 3 * O_CODE).any(axis=1)
+    return np.where(x_wins, X_CODE, np.where(o_wins, O_CODE, 0)).astype(np.int8)
+
+
+def utilities(boards):
+    """
+    Returns 1 for each board X has won, -1 for each O has won, 0 otherwise.
+    """
+    return winners(boards) * X_CODE
+
+
+def terminals(boards):
+    """
+    Returns True for each board where the game is over.
+    """
+    flat = flatten(boards)
+    return (winners(flat) != 0) | (flat != 0).all(axis=1)
+
+
+def players(boards):
+    """
+    Returns the code of the player with the next turn on each board.
+    """
+    marked = np.count_nonzero(flatten(boards), axis=1)
+    return np.where(marked % 2 == 0, O_CODE, X_CODE).astype(np.int8)
+
+
+def evaluate(boards):
+    """
+    Returns (winners, terminals, utilities, players) for the boards,
+    sharing the work between them.
+    """
+    flat = flatten(boards)
+    winner = winners(flat)
+    terminal = (winner != 0) | (flat != 0).all(axis=1)
+    return winner, terminal, winner * X_CODE, players(flat)
@@ -1,4 +1,5 @@
 import itertools
+from collections import defaultdict
 
 
 class Sentence():
@@ -15,6 +16,14 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def expression(self, slots):
+        """Returns Python source evaluating the sentence on a model m.
+
+        m is a sequence of booleans, holding the value of each symbol at
+        the index slots gives for its name.
+        """
+        raise Exception("nothing to compile")
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -68,6 +77,12 @@ class Symbol(Sentence):
     def symbols(self):
         return {self.name}
 
+    def expression(self, slots):
+        try:
+            return f"m[{slots[self.name]}]"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
 
 class Not(Sentence):
     def __init__(self, operand):
@@ -92,6 +107,9 @@ class Not(Sentence):
     def symbols(self):
         return self.operand.symbols()
 
+    def expression(self, slots):
+        return f"(not {self.operand.expression(slots)})"
+
 
 class And(Sentence):
     def __init__(self, *conjuncts):
@@ -129,6 +147,13 @@ class And(Sentence):
     def symbols(self):
         return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
+    def expression(self, slots):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            [conjunct.expression(slots) for conjunct in self.conjuncts]
+        ) + ")"
+
 
 class Or(Sentence):
     def __init__(self, *disjuncts):
@@ -160,6 +185,13 @@ class Or(Sentence):
     def symbols(self):
         return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
+    def expression(self, slots):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            [disjunct.expression(slots) for disjunct in self.disjuncts]
+        ) + ")"
+
 
 class Implication(Sentence):
     def __init__(self, antecedent, consequent):
@@ -191,6 +223,11 @@ class Implication(Sentence):
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
+    def expression(self, slots):
+        antecedent = self.antecedent.expression(slots)
+        consequent = self.consequent.expression(slots)
+        return f"(not {antecedent} or {consequent})"
+
 
 class Biconditional(Sentence):
     def __init__(self, left, right):
@@ -211,10 +248,7 @@ class Biconditional(Sentence):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
@@ -224,40 +258,226 @@ class Biconditional(Sentence):
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
+    def expression(self, slots):
+        left = self.left.expression(slots)
+        right = self.right.expression(slots)
+        return f"({left} == {right})"
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
-
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
 
-        # If model has an assignment for each symbol
-        if not symbols:
+def compile_sentence(sentence, symbols):
+    """Returns a function evaluating sentence on a sequence of booleans.
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
+    The booleans give the values of symbols, in order. The sentence is
+    turned into a single Python expression over the sequence, so that
+    evaluating it needs no method calls or lookups by symbol name.
+    """
+    slots = {name: i for i, name in enumerate(symbols)}
+    source = f"lambda m: {sentence.expression(slots)}"
+    try:
+        return eval(source, {})
+    except (SyntaxError, RecursionError, MemoryError):
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
+        # Too deeply nested for the parser, so evaluate the tree instead
+        return lambda m: sentence.evaluate(dict(zip(symbols, m)))
 
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
-
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+def model_check_truth_table(knowledge, query):
+    """Checks if knowledge base entails query by enumerating all models."""
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+
+    # Query must be true in every model where knowledge base is true
+    check = compile_sentence(Implication(knowledge, query), symbols)
+    models = itertools.product((True, False), repeat=len(symbols))
+    return all(map(check, models))
+
+
+class CNF():
+    """Clauses over integer variables, built from sentences.
+
+    Each symbol is a positive integer variable and a negative integer is
+    its negation. Compound subformulas get a fresh variable defined to be
+    equivalent to them (the Tseitin transformation), so the number of
+    clauses grows linearly with the size of the sentences.
+    """
+
+    def __init__(self):
+        self.variables = dict()
+        self.count = 0
+        self.clauses = []
+        self.literals = dict()
+
+    def variable(self, name):
+        """Returns the variable for a symbol name."""
+        if name not in self.variables:
+            self.count += 1
+            self.variables[name] = self.count
+        return self.variables[name]
+
+    def fresh(self):
+        """Returns a new variable not standing for any symbol."""
+        self.count += 1
+        return self.count
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to sentence, defining it if needed."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        v = self.fresh()
+        if isinstance(sentence, And):
+            parts = [self.literal(c) for c in sentence.conjuncts]
+            for part in parts:
+                self.clauses.append([-v, part])
+            self.clauses.append([v] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.literal(d) for d in sentence.disjuncts]
+            for part in parts:
+                self.clauses.append([v, -part])
+            self.clauses.append([-v] + parts)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            self.clauses.extend([[-v, -a, b], [v, a], [v, -b]])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            self.clauses.extend([[-v, -a, b], [-v, a, -b],
+                                 [v, a, b], [v, -a, -b]])
+        else:
+            raise TypeError(f"cannot convert {sentence} to CNF")
+        self.literals[sentence] = v
+        return v
+
+    def add(self, sentence):
+        """Adds clauses requiring sentence to be true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(d) for d in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+
+def solve(clauses, count):
+    """Returns a satisfying assignment for clauses over variables 1 to count.
+
+    The assignment is a list of booleans indexed by variable, or None if
+    the clauses are unsatisfiable. Uses DPLL search with unit propagation
+    over two watched literals per clause.
+    """
+    value = [None] * (count + 1)
+    trail = []
+    watches = defaultdict(list)
+    occurrences = [0] * (count + 1)
+    kept = []
+
+    def is_true(lit):
+        return value[abs(lit)] == (lit > 0)
+
+    def is_false(lit):
+        return value[abs(lit)] == (lit < 0)
+
+    def assign(lit):
+        value[abs(lit)] = lit > 0
+        trail.append(lit)
+
+    # Drop duplicate literals and clauses that are always true, and
+    # collect unit clauses
+    for clause in clauses:
+        clause = list(dict.fromkeys(clause))
+        if any(-lit in clause for lit in clause):
+            continue
+        if not clause:
+            return None
+        for lit in clause:
+            occurrences[abs(lit)] += 1
+        if len(clause) == 1:
+            if is_false(clause[0]):
+                return None
+            if not is_true(clause[0]):
+                assign(clause[0])
+        else:
+            watches[clause[0]].append(clause)
+            watches[clause[1]].append(clause)
+            kept.append(clause)
+
+    def propagate(head):
+        """Propagates trail[head:], returning False on a conflict."""
+        while head < len(trail):
+            false_lit = -trail[head]
+            head += 1
+            watching = watches[false_lit]
+            i = 0
+            while i < len(watching):
+                clause = watching[i]
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if is_true(clause[0]):
+                    i += 1
+                    continue
+
+                # Look for another literal to watch
+                for k in range(2, len(clause)):
+                    if not is_false(clause[k]):
+                        clause[1], clause[k] = clause[k], clause[1]
+                        watches[clause[1]].append(clause)
+                        watching[i] = watching[-1]
+                        watching.pop()
+                        break
+                else:
+                    if is_false(clause[0]):
+                        return False
+                    assign(clause[0])
+                    i += 1
+        return True
+
+    # Decide the most common variables first
+    order = sorted(range(1, count + 1), key=lambda v: -occurrences[v])
+
+    # Each decision is (trail length before it, literal, whether flipped)
+    decisions = []
+    head = 0
+    while True:
+        if propagate(head):
+            head = len(trail)
+            v = next((v for v in order if value[v] is None), None)
+            if v is None:
+                return [bool(x) for x in value]
+            decisions.append((len(trail), -v, False))
+            assign(-v)
+            continue
+
+        # Undo up to the last decision not yet tried both ways
+        while decisions and decisions[-1][2]:
+            decisions.pop()
+        if not decisions:
+            return None
+        length, lit, _ = decisions.pop()
+        for undone in trail[length:]:
+            value[abs(undone)] = None
+        del trail[length:]
+        decisions.append((length, -lit, True))
+        assign(-lit)
+        head = length
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query.
+
+    The knowledge base entails the query exactly when the knowledge base
+    together with the negation of the query is unsatisfiable.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return solve(cnf.clauses, cnf.count) is None